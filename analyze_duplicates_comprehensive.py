@@ -3,12 +3,20 @@
 Comprehensive duplicate analysis including cross-brand duplicates and fuzzy matching.
 """
 
+import argparse
 import csv
+import itertools
+import math
+import operator
+import random
 import re
+import statistics
 from collections import defaultdict, Counter
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit
 import json
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 
 def similarity_score(a: str, b: str) -> float:
@@ -16,8 +24,12 @@ def similarity_score(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
+@lru_cache(maxsize=2 ** 18)
 def normalize_name_aggressive(name: str) -> str:
-    """Aggressively normalize spirit name for cross-brand comparison."""
+    """Aggressively normalize spirit name for cross-brand comparison.
+    
+    Cached because scraped exports repeat the same titles many times.
+    """
     # Convert to lowercase
     normalized = name.lower()
     
@@ -104,6 +116,165 @@ def extract_all_attributes(name: str, spirit_data: Dict) -> Dict[str, str]:
     return attributes
 
 
+# Row-level name patterns reported by the comprehensive analysis
+NAME_PATTERNS = {
+    'size_variants': (r'\b(sample|miniature|magnum|traveler|50ml|375ml|1L|1\.75L)\b', re.IGNORECASE),
+    'marketing_variants': (r'(order.*online|ratings.*reviews|lowest.*prices|gift.*box)', re.IGNORECASE),
+    'year_variants': (r'\b20\d{2}\b', 0),
+    'proof_variants': (r'\b\d+\s*(proof|pf)\b', re.IGNORECASE),
+}
+
+
+def detect_name_patterns(name: str) -> List[str]:
+    """Return the duplicate patterns (size, marketing, year, proof) a name matches."""
+    return [
+        pattern for pattern, (regex, flags) in NAME_PATTERNS.items()
+        if re.search(regex, name, flags)
+    ]
+
+
+@lru_cache(maxsize=2 ** 18)
+def core_product_name(name: str) -> str:
+    """Normalized name with type indicators (bourbon, vodka, ...) removed."""
+    core_name = re.sub(r'\b(bourbon|rye|whiskey|scotch|single malt|vodka|gin|rum)\b', '',
+                       name, flags=re.IGNORECASE)
+    return normalize_name_aggressive(core_name)
+
+
+def find_type_mismatches(brand_spirits: List[Dict]) -> List[Dict]:
+    """Find groups within one brand that share a core name but differ in type."""
+    # Group by core name (without type indicators)
+    core_name_groups = defaultdict(list)
+    for spirit in brand_spirits:
+        core_name = core_product_name(spirit['name'])
+        if core_name:  # Only if there's still a name after removing type
+            core_name_groups[core_name].append(spirit)
+    
+    mismatches = []
+    for core_name, group in core_name_groups.items():
+        types = set(s['type'] for s in group)
+        if len(types) > 1 and len(group) > 1:
+            mismatches.append({
+                'core_name': core_name,
+                'spirits': group,
+                'types': list(types)
+            })
+    
+    return mismatches
+
+
+# Query parameters that only track the visit. Variant selectors such as
+# Shopify's ?variant= are kept: they tell bottle sizes of one product apart.
+URL_IGNORED_PARAMS = re.compile(
+    r'^(utm_\w+|ref|ref_|refsrc|source|src|gclid|gbraid|wbraid|dclid|fbclid|msclkid|'
+    r'mc_cid|mc_eid|_ga|_gl|srsltid|affiliate|aff|aff_id|clickid)$',
+    re.IGNORECASE,
+)
+
+# Retailer path variants that point at the same product page
+URL_VARIANT_PATHS = [
+    (re.compile(r'^/collections/[^/]+(/products/[^/]+)'), r'\1'),  # Shopify collection links
+    (re.compile(r'/ref=[^/]*$'), ''),                              # Amazon /dp/ASIN/ref=...
+]
+
+
+def canonicalize_source_url(url: Optional[str]) -> Optional[str]:
+    """Reduce a scraped source URL to the product page it identifies.
+
+    Drops the scheme, ``www``, default ports, fragments, trailing slashes,
+    tracking query parameters and known retailer path variants, and sorts
+    the remaining parameters. Returns None when there is no usable URL:
+    malformed ones, placeholders like ``N/A`` and bare domains or homepages,
+    which would otherwise lump a whole retailer together.
+    """
+    if not url or not url.strip():
+        return None
+
+    url = url.strip()
+    if '://' not in url:
+        url = f"//{url}"
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:  # bad port or unbalanced IPv6 brackets
+        return None
+
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if '.' not in host:
+        return None
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    for pattern, replacement in URL_VARIANT_PATHS:
+        path = pattern.sub(replacement, path)
+    path = path.rstrip('/')
+    if not path:
+        return None
+
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not URL_IGNORED_PARAMS.match(key)
+    )
+    query = urlencode(params)
+
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def build_source_url_index(spirits: List[Dict]) -> Dict[str, List[Dict]]:
+    """Hash spirits by canonical source URL; rows without a URL are left out."""
+    index = defaultdict(list)
+    for spirit in spirits:
+        canonical = canonicalize_source_url(spirit.get('source_url'))
+        if canonical:
+            index[canonical].append(spirit)
+    return index
+
+
+def listing_key(spirit: Dict) -> Tuple[str, str]:
+    """Brand and name with only case, punctuation and spacing normalized.
+
+    Deliberately stricter than normalize_name_aggressive, which drops sizes
+    and editions: rows sharing a URL only collapse when they name the same
+    bottle, so listing or search pages recorded as the source of many
+    products are left alone.
+    """
+    brand = re.sub(r'\s+', ' ', (spirit.get('brand') or '').lower()).strip()
+    name = re.sub(r'[^\w\s]', ' ', spirit['name'].lower())
+    name = re.sub(r'\s+', ' ', name).strip()
+    return brand, name
+
+
+def collapse_source_url_duplicates(spirits: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Collapse rows scraped from the same product page before name matching.
+
+    Rows are hashed by canonical URL and ``listing_key``, so the work is
+    linear in the number of rows however many share a URL. Returns the rows
+    left for the expensive stages (the first row of every cluster plus every
+    row without a URL, in input order) and the clusters with more than one
+    row.
+    """
+    clusters = []
+    for canonical, group in build_source_url_index(spirits).items():
+        listings = defaultdict(list)
+        for spirit in group:
+            listings[listing_key(spirit)].append(spirit)
+        clusters.extend({'canonical_url': canonical, 'spirits': cluster}
+                        for cluster in listings.values() if len(cluster) > 1)
+    collapsed = {id(spirit) for cluster in clusters for spirit in cluster['spirits'][1:]}
+    remaining = [spirit for spirit in spirits if id(spirit) not in collapsed]
+    return remaining, clusters
+
+
+def cross_brand_pair_count(spirits: List[Dict]) -> int:
+    """Pairs the cross-brand similarity loop scores: those whose brands differ."""
+    total = len(spirits)
+    brand_counts = Counter(spirit['brand'] for spirit in spirits)
+    return (total * (total - 1) - sum(n * (n - 1) for n in brand_counts.values())) // 2
+
+
 def find_all_duplicate_patterns(spirits: List[Dict]) -> Dict:
     """Find all types of duplicate patterns in the dataset."""
     
@@ -144,9 +315,18 @@ def find_all_duplicate_patterns(spirits: List[Dict]) -> Dict:
                     'spirits': group
                 })
     
+    # Rows scraped from the same product page are duplicates without any
+    # name comparison; only one row per page goes on to the O(N^2) stage
+    remaining_spirits, url_duplicates = collapse_source_url_duplicates(spirits)
+    url_prefilter = {
+        'rows_in': len(spirits),
+        'rows_removed': len(spirits) - len(remaining_spirits),
+        'comparisons_avoided': cross_brand_pair_count(spirits) - cross_brand_pair_count(remaining_spirits),
+    }
+
     # Find cross-brand matches (same product, different listings)
     all_spirits_normalized = []
-    for spirit in spirits:
+    for spirit in remaining_spirits:
         normalized = normalize_name_aggressive(spirit['name'])
         all_spirits_normalized.append((normalized, spirit))
     
@@ -166,47 +346,17 @@ def find_all_duplicate_patterns(spirits: List[Dict]) -> Dict:
     
     # Identify specific duplicate patterns
     for spirit in spirits:
-        name = spirit['name']
-        
-        # Size variants
-        if re.search(r'\b(sample|miniature|magnum|traveler|50ml|375ml|1L|1\.75L)\b', name, re.IGNORECASE):
-            pattern_duplicates['size_variants'].append(spirit)
-        
-        # Marketing text
-        if re.search(r'(order.*online|ratings.*reviews|lowest.*prices|gift.*box)', name, re.IGNORECASE):
-            pattern_duplicates['marketing_variants'].append(spirit)
-        
-        # Year variants
-        if re.search(r'\b20\d{2}\b', name):
-            pattern_duplicates['year_variants'].append(spirit)
-        
-        # Proof variants
-        if re.search(r'\b\d+\s*(proof|pf)\b', name, re.IGNORECASE):
-            pattern_duplicates['proof_variants'].append(spirit)
+        for pattern in detect_name_patterns(spirit['name']):
+            pattern_duplicates[pattern].append(spirit)
     
     # Find type mismatches (same product, different type classification)
     for brand, brand_spirits in brand_groups.items():
-        # Group by core name (without type indicators)
-        core_name_groups = defaultdict(list)
-        for spirit in brand_spirits:
-            # Remove type indicators from name
-            core_name = re.sub(r'\b(bourbon|rye|whiskey|scotch|single malt|vodka|gin|rum)\b', '', 
-                              spirit['name'], flags=re.IGNORECASE)
-            core_name = normalize_name_aggressive(core_name)
-            if core_name:  # Only if there's still a name after removing type
-                core_name_groups[core_name].append(spirit)
-        
-        for core_name, group in core_name_groups.items():
-            types = set(s['type'] for s in group)
-            if len(types) > 1 and len(group) > 1:
-                pattern_duplicates['type_mismatches'].append({
-                    'core_name': core_name,
-                    'spirits': group,
-                    'types': list(types)
-                })
+        pattern_duplicates['type_mismatches'].extend(find_type_mismatches(brand_spirits))
     
     return {
         'brand_duplicates': dict(brand_duplicates),
+        'url_duplicates': url_duplicates,
+        'url_prefilter': url_prefilter,
         'cross_brand_matches': cross_brand_matches,
         'pattern_duplicates': pattern_duplicates
     }
@@ -241,7 +391,21 @@ def print_comprehensive_analysis(csv_file: str):
             for spirit in dup['spirits']:
                 print(f"    - {spirit['name']}")
     
-    # 2. Cross-brand matches
+    # 2. Same source URL
+    print("\n\n## SAME SOURCE URL ##\n")
+    url_prefilter = patterns['url_prefilter']
+    if patterns['url_duplicates']:
+        print(f"Found {len(patterns['url_duplicates'])} product pages scraped more than once:\n")
+        for cluster in patterns['url_duplicates'][:5]:  # Show first 5
+            print(f"  {cluster['canonical_url']}:")
+            for spirit in cluster['spirits'][:3]:
+                print(f"    - {spirit['brand']}: {spirit['name']}")
+    else:
+        print("No rows share a source URL.")
+    print(f"\nRows removed before name similarity: {url_prefilter['rows_removed']} "
+          f"of {url_prefilter['rows_in']} ({url_prefilter['comparisons_avoided']:,} comparisons avoided)")
+    
+    # 3. Cross-brand matches
     print("\n\n## POTENTIAL CROSS-BRAND DUPLICATES ##\n")
     if patterns['cross_brand_matches']:
         print(f"Found {len(patterns['cross_brand_matches'])} potential cross-brand matches:\n")
@@ -253,7 +417,7 @@ def print_comprehensive_analysis(csv_file: str):
     else:
         print("No cross-brand duplicates found.")
     
-    # 3. Pattern-based analysis
+    # 4. Pattern-based analysis
     print("\n## DUPLICATE PATTERNS ##\n")
     
     for pattern_type, spirits_list in patterns['pattern_duplicates'].items():
@@ -278,7 +442,7 @@ def print_comprehensive_analysis(csv_file: str):
                     for name in names[:2]:
                         print(f"    - {name}")
     
-    # 4. Summary statistics
+    # 5. Summary statistics
     print("\n\n## SUMMARY STATISTICS ##\n")
     
     # Calculate unique spirits after deduplication
@@ -318,6 +482,8 @@ def print_comprehensive_analysis(csv_file: str):
             'unique_spirits': unique_count,
             'duplicate_rate': len(all_duplicate_ids) / len(spirits) * 100,
             'within_brand_duplicates': total_brand_duplicates,
+            'source_url_duplicate_groups': len(patterns['url_duplicates']),
+            'source_url_prefilter': patterns['url_prefilter'],
             'cross_brand_matches': len(patterns['cross_brand_matches']),
             'pattern_statistics': {
                 pattern: len(spirits_list) if pattern != 'type_mismatches' 
@@ -330,5 +496,283 @@ def print_comprehensive_analysis(csv_file: str):
     print("\n\nComprehensive report saved to: duplicate_analysis_comprehensive.json")
 
 
+def count_brand_duplicates(brand_spirits: List[Dict]) -> int:
+    """Count rows marked as duplicates within one brand (all but the first of each group)."""
+    name_groups = Counter(normalize_name_aggressive(s['name']) for s in brand_spirits)
+    return sum(count - 1 for count in name_groups.values())
+
+
+def _confidence_interval(estimate: float, variance: float, z: float) -> Dict[str, float]:
+    """Express a rate estimate and its normal-approximation interval as percentages."""
+    margin = z * math.sqrt(max(variance, 0.0))
+    return {
+        'estimate': estimate * 100,
+        'margin': margin * 100,
+        'ci_low': max(0.0, estimate - margin) * 100,
+        'ci_high': min(1.0, estimate + margin) * 100,
+    }
+
+
+def _neyman_allocation(strata: Dict[int, Tuple[int, float]], target_variance: float) -> Dict[int, int]:
+    """Allocate sample sizes across strata of (population, std dev) to reach a target variance.
+    
+    Strata whose share reaches their population are taken in full and the
+    remaining strata re-solved, since fully enumerated strata add no variance.
+    """
+    allocation = {}
+    remaining = {h for h, (population, _) in strata.items() if population}
+    
+    while remaining:
+        weight = sum(strata[h][0] * strata[h][1] for h in remaining)
+        if not weight:
+            # No spread left to sample away; two units still give a variance estimate
+            allocation.update({h: min(strata[h][0], 2) for h in remaining})
+            break
+        
+        spread = sum(strata[h][0] * strata[h][1] ** 2 for h in remaining)
+        n = weight ** 2 / (target_variance + spread)
+        shares = {h: n * strata[h][0] * strata[h][1] / weight for h in remaining}
+        
+        saturated = {h for h in remaining if shares[h] >= strata[h][0]}
+        if not saturated:
+            for h in remaining:
+                allocation[h] = min(strata[h][0], max(2, math.ceil(shares[h])))
+            break
+        
+        for h in saturated:
+            allocation[h] = strata[h][0]
+        remaining -= saturated
+    
+    return allocation
+
+
+def _analyze_block(rows: List[Dict]) -> Tuple[int, int, int]:
+    """Return (duplicate rows, rows in type-mismatch groups, type-mismatch groups) for one brand."""
+    mismatches = find_type_mismatches(rows)
+    return (
+        count_brand_duplicates(rows),
+        sum(len(m['spirits']) for m in mismatches),
+        len(mismatches),
+    )
+
+
+def estimate_duplicate_rates(csv_file: str, error_bound: float = 0.01,
+                             confidence: float = 0.95, seed: int = None,
+                             pilot_blocks: int = 20) -> Dict:
+    """Estimate the duplicate rate and pattern rates from stratified samples.
+    
+    Two streaming passes over the CSV replace the full analysis:
+    
+    1. Count rows per brand and per type.
+    2. Keep the rows of a stratified sample of brand blocks and of a simple
+       random sample of rows (post-stratified by type) for the name
+       patterns. Rows in neither sample are filtered out in C, so this pass
+       costs little more than parsing.
+    
+    Within-brand duplicates and type mismatches never cross a brand, so each
+    sampled block is analysed exactly and scaled up by its stratum's sampling
+    fraction. Blocks are stratified by size class; the worst-case allocation
+    decides which rows to keep, and a pilot of ``pilot_blocks`` per stratum
+    then decides how many of them to actually analyse. Rates are percentages
+    with normal-approximation intervals; ``error_bound`` is the target
+    half-width as a fraction of all rows.
+    """
+    rng = random.Random(seed)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    
+    # Pass 1: block and stratum sizes (csv.reader avoids a dict per row, and
+    # dict.get counts faster than Counter's __missing__)
+    brand_counts = {}
+    type_counts = {}
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        name_col, brand_col, type_col = (header.index(c) for c in ('name', 'brand', 'type'))
+        for row in reader:
+            brand = row[brand_col]
+            spirit_type = row[type_col]
+            brand_counts[brand] = brand_counts.get(brand, 0) + 1
+            type_counts[spirit_type] = type_counts.get(spirit_type, 0) + 1
+    
+    total_rows = sum(brand_counts.values())
+    if not total_rows:
+        raise ValueError(f"No spirits found in {csv_file}")
+    
+    # Stratify brand blocks by size class (2-3, 4-7, 8-15, ...). Single-row
+    # blocks cannot contain duplicates and are never sampled.
+    block_strata = defaultdict(list)
+    for brand, size in brand_counts.items():
+        if size > 1:
+            block_strata[size.bit_length() - 1].append(brand)
+    
+    # A block of m rows contributes at most m duplicate or mismatch rows, so
+    # max(m) / 2 bounds each stratum's standard deviation
+    target_variance = (error_bound * total_rows / z) ** 2
+    worst_case = _neyman_allocation(
+        {h: (len(brands), max(brand_counts[b] for b in brands) / 2) for h, brands in block_strata.items()},
+        target_variance,
+    )
+    sampled_brands = {}
+    for h, brands in block_strata.items():
+        for brand in rng.sample(brands, max(worst_case[h], min(len(brands), pilot_blocks))):
+            sampled_brands[brand] = h
+    
+    # Row sample size for a proportion at worst case p = 0.5, with finite
+    # population correction
+    n0 = (z / error_bound) ** 2 / 4
+    row_sample_size = math.ceil(n0 / (1 + (n0 - 1) / total_rows))
+    sampled_rows = set(rng.sample(range(total_rows), row_sample_size))
+    
+    # Pass 2: collect sampled blocks and sampled rows
+    block_rows = defaultdict(list)
+    type_samples = Counter()
+    pattern_hits = defaultdict(Counter)
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        # Filter in C (tee + compress) so rows outside both samples cost only the parse
+        rows, keys = itertools.tee(reader)
+        wanted = map(
+            operator.or_,
+            map(sampled_rows.__contains__, itertools.count()),
+            map(sampled_brands.__contains__, map(operator.itemgetter(brand_col), keys)),
+        )
+        for index, row in itertools.compress(zip(itertools.count(), rows), wanted):
+            if row[brand_col] in sampled_brands:
+                block_rows[row[brand_col]].append({'name': row[name_col], 'type': row[type_col]})
+            if index in sampled_rows:
+                type_samples[row[type_col]] += 1
+                pattern_hits[row[type_col]].update(detect_name_patterns(row[name_col]))
+    
+    # Pilot: analyse the first blocks of each (randomly ordered) stratum sample
+    # and re-allocate with the observed spread instead of the worst case
+    stratum_samples = defaultdict(list)
+    for brand, h in sampled_brands.items():
+        stratum_samples[h].append(brand)
+    
+    block_results = defaultdict(list)
+    pilot_spread = {}
+    for h, brands in stratum_samples.items():
+        rng.shuffle(brands)
+        results = [_analyze_block(block_rows[b]) for b in brands[:pilot_blocks]]
+        block_results[h] = results
+        pilot_spread[h] = max(
+            (statistics.stdev(values) if len(values) > 1 else 0.0)
+            for values in zip(*results)
+        )
+    
+    allocation = _neyman_allocation(
+        {h: (len(block_strata[h]), pilot_spread[h]) for h in block_strata}, target_variance)
+    for h, brands in stratum_samples.items():
+        # The analysed blocks are a prefix of a random order, so still a simple random sample
+        sample_size = min(len(brands), max(allocation[h], len(block_results[h])))
+        block_results[h].extend(_analyze_block(block_rows[b]) for b in brands[len(block_results[h]):sample_size])
+    
+    # Stratified estimates of duplicate rows, mismatch rows and mismatch groups
+    totals = [0.0, 0.0, 0.0]
+    variances = [0.0, 0.0, 0.0]
+    for h, results in block_results.items():
+        population = len(block_strata[h])
+        sampled = len(results)
+        for metric, values in enumerate(zip(*results)):
+            totals[metric] += population * statistics.fmean(values)
+            if sampled < population:
+                variances[metric] += (population ** 2 * (1 - sampled / population)
+                                      * statistics.variance(values) / sampled)
+    duplicates, mismatch_rows, mismatch_groups = totals
+    
+    # Row-level pattern estimates, post-stratified by type
+    pattern_rates = {}
+    for pattern in NAME_PATTERNS:
+        estimate = 0.0
+        variance = 0.0
+        for spirit_type, n_h in type_samples.items():
+            count = type_counts[spirit_type]
+            p_h = pattern_hits[spirit_type][pattern] / n_h
+            w_h = count / total_rows
+            estimate += w_h * p_h
+            if 1 < n_h < count:
+                variance += w_h ** 2 * (1 - n_h / count) * p_h * (1 - p_h) / (n_h - 1)
+        pattern_rates[pattern] = _confidence_interval(estimate, variance, z)
+    
+    pattern_rates['type_mismatches'] = _confidence_interval(
+        mismatch_rows / total_rows, variances[1] / total_rows ** 2, z)
+    pattern_rates['type_mismatches']['estimated_groups'] = round(mismatch_groups)
+    
+    return {
+        'mode': 'approximate',
+        'total_spirits': total_rows,
+        'confidence': confidence,
+        'error_bound': error_bound * 100,
+        'duplicate_rate': _confidence_interval(duplicates / total_rows, variances[0] / total_rows ** 2, z),
+        'estimated_unique_spirits': round(total_rows - duplicates),
+        'pattern_rates': pattern_rates,
+        'sample_sizes': {
+            'pattern_rows': row_sample_size,
+            'pattern_strata': len(type_samples),
+            'brand_blocks_total': len(brand_counts),
+            'brand_blocks_sampled': sum(len(results) for results in block_results.values()),
+            'block_rows_analyzed': sum(
+                len(block_rows[b])
+                for h, brands in stratum_samples.items()
+                for b in brands[:len(block_results[h])]
+            ),
+            'block_strata': [
+                {
+                    'block_sizes': f"{2 ** h}-{2 ** (h + 1) - 1}",
+                    'blocks': len(block_strata[h]),
+                    'sampled': len(block_results[h]),
+                }
+                for h in sorted(block_strata)
+            ],
+        },
+    }
+
+
+def print_approximate_analysis(csv_file: str, error_bound: float = 0.01,
+                               confidence: float = 0.95, seed: int = None):
+    """Print sampled duplicate-rate estimates with their confidence intervals."""
+    report_data = estimate_duplicate_rates(csv_file, error_bound, confidence, seed)
+    samples = report_data['sample_sizes']
+    
+    print(f"Total spirits in file: {report_data['total_spirits']}")
+    print(f"Approximate mode: ±{report_data['error_bound']:.1f} points at {confidence:.0%} confidence")
+    print("=" * 80)
+    
+    print("\n## SAMPLE SIZES ##\n")
+    print(f"Pattern rows sampled: {samples['pattern_rows']} across {samples['pattern_strata']} type strata")
+    print(f"Brand blocks sampled: {samples['brand_blocks_sampled']} of {samples['brand_blocks_total']} "
+          f"({samples['block_rows_analyzed']} rows analyzed)")
+    for stratum in samples['block_strata']:
+        print(f"  Blocks of {stratum['block_sizes']} rows: {stratum['sampled']} of {stratum['blocks']}")
+    
+    print("\n## ESTIMATED RATES ##\n")
+    rate = report_data['duplicate_rate']
+    print(f"Duplicate rate: {rate['estimate']:.1f}% "
+          f"(CI {rate['ci_low']:.1f}% - {rate['ci_high']:.1f}%)")
+    for pattern, rate in report_data['pattern_rates'].items():
+        print(f"{pattern.replace('_', ' ').title()}: {rate['estimate']:.1f}% "
+              f"(CI {rate['ci_low']:.1f}% - {rate['ci_high']:.1f}%)")
+    
+    with open('duplicate_analysis_approximate.json', 'w') as f:
+        json.dump(report_data, f, indent=2)
+    
+    print("\n\nApproximate report saved to: duplicate_analysis_approximate.json")
+
+
 if __name__ == '__main__':
-    print_comprehensive_analysis('test-spirits.csv')
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Comprehensive duplicate analysis for a spirits CSV export.')
+    parser.add_argument('csv_file', nargs='?', default='test-spirits.csv')
+    parser.add_argument('--approximate', action='store_true',
+                        help='Estimate rates from stratified samples instead of a full analysis')
+    parser.add_argument('--error-bound', type=float, default=0.01,
+                        help='Target CI half-width as a fraction of rows (default: 0.01)')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='Confidence level for the intervals (default: 0.95)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible samples')
+    args = parser.parse_args()
+    
+    if args.approximate:
+        print_approximate_analysis(args.csv_file, args.error_bound, args.confidence, args.seed)
+    else:
+        print_comprehensive_analysis(args.csv_file)
\ No newline at end of file
@@ -0,0 +1,2573 @@
+#!/usr/bin/env python3
+"""
+Batch dry-run deduplication analysis.
+
+Python engine for `DryRunDeduplicationService.runDryRunAnalysis`
+(src/services/dry-run-deduplication.ts). Reads the spirits table (a CSV export
+or the JSONL written by the TypeScript service) and runs the same pipeline:
+the blocking-deduplication.ts passes, then exact-match groups and TF-IDF fuzzy
+candidates per block (or compareSpirits over every pair without blocking),
+match analysis, clusters and price variation groups. It writes the same
+dry-run-detailed/matches/clusters/summary report files in the same schemas;
+src/test-dry-run-engine-parity.ts checks both engines report the same matches.
+
+One optional step is Python-only and off by default, so both engines report
+the same matches: with ``sourceUrlPrefilter`` in the request (or
+``--source-url-prefilter``), rows scraped from the same product page are
+collapsed to one row before blocking (see collapse_source_url_duplicates in
+analyze_duplicates_comprehensive.py). Their pairs are scored with
+compareSpirits like any other and counted under ``sourceUrlPrefilter``.
+
+The matchers are ports of normalization-keys.ts, fuzzy-matching.ts,
+brand-normalization.ts and the deduplication services, down to JS regex and
+number semantics. Two known gaps: name sorting inside oversized brand blocks
+approximates String.prototype.localeCompare, and words that collide with
+Object.prototype keys in the TS lookup tables are looked up as plain words.
+Work is cut with exact bounds and caches only, so results are unchanged.
+
+The TypeScript CLI delegates to this script with `--request <file>`: the
+request JSON names the input and options, and a response JSON is written to
+the path it gives once the reports are on disk.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+import traceback
+import unicodedata
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from analyze_duplicates_comprehensive import collapse_source_url_duplicates
+
+
+# Mirrors DEFAULT_CONFIG in src/services/fuzzy-matching.ts
+FUZZY_MATCH_CONFIG = {
+    'threshold': 0.8,
+    'weights': {
+        'levenshtein': 0.15,
+        'jaroWinkler': 0.25,
+        'nGram': 0.2,
+        'phonetic': 0.15,
+        'tokenBased': 0.25,
+    },
+    'nGramSize': 3,
+    'caseSensitive': False,
+    'removeStopWords': True,
+}
+
+# Mirrors DEFAULT_BRAND_CONFIG in src/services/brand-normalization.ts
+BRAND_CONFIG = {
+    'strictMatching': False,
+    'minimumConfidence': 'medium',
+    'expandAbbreviations': True,
+    'normalizeCase': True,
+}
+
+# Mirrors DEFAULT_DEDUP_CONFIG in src/services/deduplication-service.ts
+DEFAULT_CONFIG = {
+    'nameThreshold': 0.7,
+    'brandThreshold': 0.85,
+    'combinedThreshold': 0.6,
+    'fuzzyConfig': FUZZY_MATCH_CONFIG,
+    'brandConfig': BRAND_CONFIG,
+    'batchSize': 100,
+    'maxDuplicates': 1000,
+    'autoMergeThreshold': 0.9,
+    'requireManualReview': True,
+    'extractAttributes': True,
+    'agePenaltyWeight': 0.2,
+    'proofPenaltyWeight': 0.15,
+    'grainTypePenaltyWeight': 0.2,
+    'sameBrandWeight': 0.15,
+    'differentBrandWeight': 0.4,
+}
+
+# Mirrors DEFAULT_FUZZY_CONFIG in src/services/fuzzy-match-deduplication.ts
+FUZZY_DEDUP_CONFIG = {
+    'sameBrandThreshold': 0.7,
+    'differentBrandThreshold': 0.85,
+    'tfidfWeight': 0.4,
+    'fuzzyWeight': 0.6,
+    'minDescriptionLength': 50,
+    'fuzzyMatchConfig': {
+        'threshold': 0.6,
+        'weights': {
+            'levenshtein': 0.2,
+            'jaroWinkler': 0.3,
+            'nGram': 0.2,
+            'phonetic': 0.1,
+            'tokenBased': 0.2,
+        },
+        'nGramSize': 3,
+        'caseSensitive': False,
+        'removeStopWords': True,
+    },
+}
+
+# Mirrors the defaults in src/services/blocking-deduplication.ts
+MAX_BLOCK_SIZE = 1000
+MIN_BLOCK_SIZE = 2
+BLOCK_NGRAM_SIZE = 3
+PROGRESSIVE_CHUNK_SIZE = 10000
+MEMORY_LIMIT_MB = 512
+MIN_SPIRITS_FOR_BLOCKING = 100
+
+# Mirrors DEFAULT_CONFIG in src/services/price-variation-handler.ts
+MAX_COEFFICIENT_OF_VARIATION = 0.5
+MIN_PRICES_FOR_STATS = 2
+OUTLIER_THRESHOLD = 2.0
+
+# Slack for the pruning bounds, far above float rounding and far below any score step
+BOUND_EPSILON = 1e-9
+
+NUMERIC_FIELDS = {'abv', 'proof', 'price', 'stock_quantity', 'data_quality_score'}
+LIST_FIELDS = {'flavor_profile', 'awards'}
+BOOLEAN_FIELDS = {'limited_edition', 'in_stock', 'description_mismatch'}
+
+csv.field_size_limit(2 ** 31 - 1)
+
+
+def _parse_list(value: str) -> List[str]:
+    """Parse a list column from a Supabase CSV export (JSON or Postgres array literal)."""
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    if value.startswith('{') and value.endswith('}'):
+        inner = value[1:-1]
+        return [item.strip().strip('"') for item in next(csv.reader([inner]))] if inner else []
+    return [value]
+
+
+def _coerce_csv_row(row: Dict[str, str]) -> Dict:
+    """Turn a CSV row into the DatabaseSpirit shape, dropping empty columns."""
+    spirit = {}
+    for field, value in row.items():
+        if value is None or value == '':
+            continue
+        if field in NUMERIC_FIELDS:
+            try:
+                spirit[field] = _js_number(float(value))
+            except ValueError:
+                continue
+        elif field in LIST_FIELDS:
+            spirit[field] = _parse_list(value)
+        elif field in BOOLEAN_FIELDS:
+            spirit[field] = value.lower() in ('true', 't', '1')
+        else:
+            spirit[field] = value
+    return spirit
+
+
+def load_spirits(path: str) -> List[Dict]:
+    """Load spirits from a CSV export, a JSON array, or JSON lines."""
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [_coerce_csv_row(row) for row in csv.DictReader(f)]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _js_number(value: float):
+    """Render whole floats as ints so numbers serialize the way JSON.stringify does."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _compact(data: Dict) -> Dict:
+    """Drop None values, as JSON.stringify drops undefined properties."""
+    return {key: value for key, value in data.items() if value is not None}
+
+
+# ---------------------------------------------------------------------------
+# JavaScript string and number semantics
+# ---------------------------------------------------------------------------
+
+# What JS matches with \s and strips with String.prototype.trim
+JS_WHITESPACE = ('\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006'
+                 '\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff')
+_JS_WHITESPACE_CLASS = ''.join(f'\\u{ord(char):04x}' for char in JS_WHITESPACE)
+
+
+def js_regex(pattern: str, flags: int = 0) -> 're.Pattern':
+    """Compile a JS regex source so its shorthand classes behave as in JS.
+
+    JS \\d, \\w and \\b are ASCII-only while \\s is Unicode, so the pattern is
+    compiled with re.ASCII and every \\s is spelled out as JS's whitespace set.
+    """
+    parts = []
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            escape = pattern[index:index + 2]
+            if escape == '\\s':
+                parts.append(_JS_WHITESPACE_CLASS if in_class else f'[{_JS_WHITESPACE_CLASS}]')
+            else:
+                parts.append(escape)
+            index += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        parts.append(char)
+        index += 1
+    return re.compile(''.join(parts), flags | re.ASCII)
+
+
+_JS_WHITESPACE_RUN = js_regex(r'\s+')
+_NON_WORD = js_regex(r'[^\w\s]')
+_NON_ALNUM = js_regex(r'[^a-z0-9]')
+
+
+def js_trim(text: str) -> str:
+    return text.strip(JS_WHITESPACE)
+
+
+def js_collapse(text: str) -> str:
+    """`.replace(/\\s+/g, ' ').trim()`"""
+    return js_trim(_JS_WHITESPACE_RUN.sub(' ', text))
+
+
+def js_length(text: str) -> int:
+    """String length in UTF-16 code units, as JS counts it."""
+    return len(text) if text.isascii() else len(text.encode('utf-16-le')) // 2
+
+
+def utf16_units(text: str) -> str:
+    """``text`` with astral characters split into surrogate pairs, so indexing matches JS."""
+    if text.isascii():
+        return text
+    return ''.join(char if ord(char) < 0x10000
+                   else chr(0xd7c0 + (ord(char) >> 10)) + chr(0xdc00 + (ord(char) & 0x3ff))
+                   for char in text)
+
+
+def js_number_str(value: float) -> str:
+    """Format a number the way JS's Number.prototype.toString does."""
+    if value != value:
+        return 'NaN'
+    if value in (math.inf, -math.inf):
+        return 'Infinity' if value > 0 else '-Infinity'
+    if value == 0:
+        return '0'
+    sign = '-' if value < 0 else ''
+    _, digit_tuple, exponent = Decimal(repr(abs(float(value)))).normalize().as_tuple()
+    digits = ''.join(map(str, digit_tuple))
+    point = exponent + len(digits)
+    if len(digits) <= point <= 21:
+        return sign + digits + '0' * (point - len(digits))
+    if 0 < point <= 21:
+        return sign + digits[:point] + '.' + digits[point:]
+    if -6 < point <= 0:
+        return sign + '0.' + '0' * -point + digits
+    power = point - 1
+    mantissa = digits[0] + ('.' + digits[1:] if len(digits) > 1 else '')
+    return f"{sign}{mantissa}e{'+' if power >= 0 else '-'}{abs(power)}"
+
+
+def js_date_json(value) -> Optional[str]:
+    """JSON form of ``new Date(value)``: ISO 8601 in UTC with milliseconds, None if invalid.
+
+    Date-only strings parse as UTC and date-times without an offset as local
+    time, as in JS.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        moment = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    else:
+        text = str(value).strip()
+        try:
+            moment = datetime.fromisoformat(text[:-1] + '+00:00' if text.endswith('Z') else text)
+        except ValueError:
+            return None
+        if moment.tzinfo is None:
+            date_only = 'T' not in text and ' ' not in text
+            moment = moment.replace(tzinfo=timezone.utc) if date_only else moment.astimezone()
+    moment = moment.astimezone(timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _is_array_index(key: str) -> bool:
+    return (key.isascii() and key.isdigit() and (key == '0' or key[0] != '0')
+            and int(key) < 2 ** 32 - 1)
+
+
+def js_key_order(keys) -> List[str]:
+    """Property order of a JS object: integer-like keys ascending, then insertion order."""
+    keys = list(keys)
+    indices = sorted((key for key in keys if _is_array_index(key)), key=int)
+    return indices + [key for key in keys if not _is_array_index(key)]
+
+
+def js_sum(values) -> float:
+    """Left-to-right sum, like `reduce((sum, v) => sum + v, 0)`."""
+    total = 0
+    for value in values:
+        total += value
+    return total
+
+
+def _locale_char_key(char: str) -> Tuple[int, str]:
+    category = unicodedata.category(char)
+    if char in JS_WHITESPACE or category.startswith('Z'):
+        return 0, char
+    if category.startswith('P'):
+        return 1, char
+    if category.startswith('S'):
+        return 2, char
+    if category == 'Nd':
+        return 3, str(unicodedata.digit(char))
+    return 4, char.casefold()
+
+
+def locale_sort_key(text: str) -> Tuple:
+    """Approximate `localeCompare` ordering (root collation).
+
+    Compares base characters first (spaces < punctuation < symbols < digits <
+    letters, ignoring case and accents), then accents, then lowercase before
+    uppercase.
+    """
+    decomposed = unicodedata.normalize('NFD', text)
+    base = [char for char in decomposed if not unicodedata.combining(char)]
+    return (tuple(_locale_char_key(char) for char in base),
+            tuple(ord(char) for char in decomposed if unicodedata.combining(char)),
+            tuple(char.isupper() for char in base))
+
+
+# ---------------------------------------------------------------------------
+# Normalization keys (port of src/services/normalization-keys.ts)
+# ---------------------------------------------------------------------------
+
+SIZE_PATTERNS = [js_regex(pattern, re.I) for pattern in (
+    r'\b\d+\s*ml\b',
+    r'\b\d+\s*m\s*l\b',
+    r'\b\d+\s*milliliters?\b',
+    r'\b\d+\s*liters?\b',
+    r'\b\d+\s*l\b',
+    r'\b\d+\s*cl\b',
+    r'\b\d+\s*oz\b',
+    r'\b\d+\s*ounces?\b',
+    r'\b(sample|samples)\b',
+    r'\b(miniature|mini|minis)\b',
+    r'\b(magnum|magnums)\b',
+    r'\b(traveler|travelers|travel)\s*(size|bottle)?\b',
+    r'\b(half|quarter)\s*bottle\b',
+    r'\b(double|triple)\s*size\b',
+    r'\b(large|small|medium)\s*(bottle|format|size)?\b',
+    r'\b\d+\s*pack\b',
+    r'\bpack\s*of\s*\d+\b',
+)]
+
+MARKETING_PATTERNS = [js_regex(pattern, re.I) for pattern in (
+    r'\bgift\s*(box|set|pack|package|edition)\b',
+    r'\b(holiday|christmas|fathers?\s*day|mothers?\s*day)\s*(gift|edition|special)\b',
+    r'\bwith\s*(glass|glasses|tumbler|rocks\s*glass)\b',
+    r'\b(order|buy|shop)\s*online\b',
+    r'\b(ratings?\s*and\s*reviews?|reviews?\s*and\s*ratings?)\b',
+    r'\b(online|web)\s*exclusive\b',
+    r'\b(in\s*stock|out\s*of\s*stock|availability)\b',
+    r'\b(free\s*shipping|ships?\s*free)\b',
+    r'\b(limited|special)\s*(time|offer|deal|price)\b',
+    r'\b(sale|discount|save|off)\s*\d*%?\b',
+    r'\b(total\s*wine|klwines|finedrams|thewhiskyexchange)\b',
+    r'\b(store\s*pick|exclusive\s*selection|private\s*selection)\b',
+)]
+
+YEAR_PATTERNS = [
+    js_regex(r'\(\d{4}\)'),
+    js_regex(r'\b20\d{2}\s*release\b', re.I),
+    js_regex(r'\b20\d{2}\s*edition\b', re.I),
+    js_regex(r'\breleased?\s*in\s*\d{4}\b', re.I),
+]
+# /(?<!\d\s*)(year|yr)\s*\d{4}/gi needs a variable-width lookbehind; checked in code
+_UNPROTECTED_YEAR = js_regex(r'(year|yr)\s*\d{4}', re.I)
+_AGE_STATEMENT = js_regex(r'\b(\d{1,3})\s*(year|yr|y\.o\.|yo)\b', re.I)
+
+PROOF_PATTERNS = [
+    (js_regex(r'\bproof\b', re.I), 'pf'),
+    (js_regex(r'\bpf\b', re.I), 'pf'),
+    (js_regex(r'\bproof\.', re.I), 'pf'),
+    (js_regex(r'\bp\.f\.', re.I), 'pf'),
+]
+
+ABBREVIATION_PATTERNS = [
+    (js_regex(r'\bwhiskey\b'), 'whisky'),
+    (js_regex(r'\bbottled\s*in\s*bond\b', re.I), 'bib'),
+    (js_regex(r'\bsingle\s*barrel\b', re.I), 'sb'),
+    (js_regex(r'\bsingle-barrel\b', re.I), 'sb'),
+    (js_regex(r'\bsmall\s*batch\b', re.I), 'smb'),
+    (js_regex(r'\bcask\s*strength\b', re.I), 'cs'),
+    (js_regex(r'\bbarrel\s*proof\b', re.I), 'bp'),
+    (js_regex(r'\bstraight\s*bourbon\s*whisky\b', re.I), 'bourbon'),
+    (js_regex(r'\bstraight\s*bourbon\b', re.I), 'bourbon'),
+    (js_regex(r'\bkentucky\s*straight\s*bourbon\b', re.I), 'ky bourbon'),
+    (js_regex(r'\bkentucky\s*straight\b', re.I), 'ky'),
+    (js_regex(r"['`]"), ''),
+    (js_regex(r'["]'), ''),
+    (js_regex('[\u2010-\u2015]'), '-'),
+]
+
+_NON_KEY_CHARS = js_regex(r'[^a-z0-9\s]')
+_WHITESPACE_OR_DIGIT = js_regex(r'[\s\d]')
+
+# Mirrors DEFAULT_NORMALIZATION_CONFIG
+NORMALIZATION_CONFIG = {
+    'removeSize': True,
+    'removeMarketing': True,
+    'removeYear': True,
+    'standardizeProof': True,
+    'removeRetailerText': True,
+    'aggressiveMode': True,
+}
+STANDARD_NORMALIZATION_CONFIG = {**NORMALIZATION_CONFIG, 'aggressiveMode': False}
+
+
+def _remove_unprotected_years(text: str) -> str:
+    def replace(match):
+        before = js_trim(text[:match.start()])
+        return match.group(0) if before and before[-1] in '0123456789' else ' '
+    return _UNPROTECTED_YEAR.sub(replace, text)
+
+
+def create_normalized_key(name: str, config: Dict = NORMALIZATION_CONFIG) -> str:
+    """Port of createNormalizedKey."""
+    normalized = js_trim(name)
+
+    if config.get('removeSize'):
+        for pattern in SIZE_PATTERNS:
+            normalized = pattern.sub(' ', normalized)
+
+    if config.get('removeMarketing'):
+        for pattern in MARKETING_PATTERNS:
+            normalized = pattern.sub(' ', normalized)
+
+    if config.get('removeYear'):
+        # Protect age statements while years are removed
+        age_statements = []
+
+        def protect(match):
+            age_statements.append(match.group(0))
+            return f"__AGE_{len(age_statements) - 1}__"
+
+        normalized = _AGE_STATEMENT.sub(protect, normalized)
+        for pattern in YEAR_PATTERNS:
+            normalized = pattern.sub(' ', normalized)
+        normalized = _remove_unprotected_years(normalized)
+        for index, age in enumerate(age_statements):
+            normalized = normalized.replace(f"__AGE_{index}__", age, 1)
+
+    if config.get('standardizeProof'):
+        for pattern, replacement in PROOF_PATTERNS:
+            normalized = pattern.sub(replacement, normalized)
+
+    normalized = normalized.lower()
+    for pattern, replacement in ABBREVIATION_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = js_collapse(normalized)
+
+    if config.get('aggressiveMode'):
+        normalized = js_collapse(_NON_KEY_CHARS.sub(' ', normalized))
+
+    return normalized
+
+
+@lru_cache(maxsize=2 ** 18)
+def create_multiple_keys(name: str) -> Tuple[str, str, str]:
+    """Port of createMultipleKeys: (standard, aggressive, ultraAggressive)."""
+    standard = create_normalized_key(name, STANDARD_NORMALIZATION_CONFIG)
+    aggressive = create_normalized_key(name)
+    return standard, aggressive, _WHITESPACE_OR_DIGIT.sub('', aggressive)
+
+
+_VARIANT_SIZE = js_regex(r'\b(\d+)\s*(ml|m\s*l|liter|l)\b', re.I)
+_VARIANT_YEAR = js_regex(r'\((\d{4})\)')
+_VARIANT_GIFT_SET = js_regex(r'gift\s*(box|set|pack)', re.I)
+_VARIANT_PROOF = js_regex(r'\b(\d+)\s*(proof|pf|p\.f\.)\b', re.I)
+
+
+def extract_variant_info(name: str) -> Dict:
+    """Port of extractVariantInfo."""
+    info = {}
+    size_match = _VARIANT_SIZE.search(name)
+    if size_match:
+        info['size'] = _JS_WHITESPACE_RUN.sub('', size_match.group(0)).lower()
+    year_match = _VARIANT_YEAR.search(name)
+    if year_match:
+        info['year'] = year_match.group(1)
+    if _VARIANT_GIFT_SET.search(name):
+        info['giftSet'] = True
+    proof_match = _VARIANT_PROOF.search(name)
+    if proof_match:
+        info['proof'] = proof_match.group(1)
+    return info
+
+
+# ---------------------------------------------------------------------------
+# Fuzzy matching (port of src/services/fuzzy-matching.ts)
+# ---------------------------------------------------------------------------
+
+STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'single', 'double', 'triple', 'malt', 'grain', 'blend', 'blended', 'aged', 'year', 'years',
+    'old', 'reserve', 'special', 'limited', 'edition', 'barrel', 'cask', 'proof', 'strength',
+])
+
+_AGGRESSIVE_KEY_PATTERNS = [js_regex(pattern, re.I) for pattern in (
+    r'\b\d+\s*m\s*l\b',
+    r'\b\d+ml\b',
+    r'\b\d+\s*liter\b',
+    r'\b\d+\s*l\b',
+)]
+_AGGRESSIVE_KEY_REPLACEMENTS = (
+    ('whiskey', 'whisky'),
+    ('bottledinbond', 'bib'),
+    ('singlebarre', 'sb'),
+    ('smallbatch', 'smb'),
+    ('straightbourbon', 'bourbon'),
+    ('kentuckystraight', 'ky'),
+    ('caskstrength', 'cs'),
+    ('barrelproof', 'bp'),
+)
+
+SOUNDEX_CODES = {
+    'B': '1', 'F': '1', 'P': '1', 'V': '1',
+    'C': '2', 'G': '2', 'J': '2', 'K': '2', 'Q': '2', 'S': '2', 'X': '2', 'Z': '2',
+    'D': '3', 'T': '3',
+    'L': '4',
+    'M': '5', 'N': '5',
+    'R': '6',
+}
+_NON_UPPER = js_regex(r'[^A-Z]')
+
+_KEY_MATCH_BREAKDOWN = {
+    'levenshtein': 0.98,
+    'jaroWinkler': 0.98,
+    'nGram': 0.98,
+    'phonetic': 0.98,
+    'tokenBased': 0.98,
+    'weighted': 0.98,
+}
+
+
+def normalize_text(text: str, case_sensitive: bool = False, remove_stop_words: bool = True) -> str:
+    """Port of normalizeText (fuzzy-matching.ts)."""
+    normalized = js_trim(text)
+    if not case_sensitive:
+        normalized = normalized.lower()
+    normalized = js_collapse(_NON_WORD.sub(' ', normalized))
+    if remove_stop_words:
+        normalized = ' '.join(word for word in normalized.split(' ')
+                              if word.lower() not in STOP_WORDS)
+    return normalized
+
+
+def create_aggressive_key(name: str) -> str:
+    """Port of createAggressiveKey (fuzzy-matching.ts)."""
+    key = name.lower()
+    for pattern in _AGGRESSIVE_KEY_PATTERNS:
+        key = pattern.sub('', key)
+    key = _NON_ALNUM.sub('', key)
+    for old, new in _AGGRESSIVE_KEY_REPLACEMENTS:
+        key = key.replace(old, new)
+    return key
+
+
+def soundex(text: str) -> str:
+    """Port of soundex (fuzzy-matching.ts)."""
+    code = _NON_UPPER.sub('', text.upper())
+    if not code:
+        return ''
+    result = code[0]
+    for char in code[1:]:
+        digit = SOUNDEX_CODES.get(char, '0')
+        if digit != '0' and digit != result[-1]:
+            result += digit
+    return (result + '0000')[:4]
+
+
+def _levenshtein_distance(a: str, b: str) -> int:
+    """Edit distance, bit-parallel (Myers/Hyyrö) over Python ints."""
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    masks = {}
+    for index, char in enumerate(a):
+        masks[char] = masks.get(char, 0) | (1 << index)
+    full = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+    positive, negative, score = full, 0, len(a)
+    for char in b:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = ((((equal & positive) + positive) & full) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & high:
+            score += 1
+        elif horizontal_negative & high:
+            score -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+    return score
+
+
+def _levenshtein_similarity(str1: str, str2: str) -> float:
+    if not str1 and not str2:
+        return 1
+    if not str1 or not str2:
+        return 0
+    return 1 - _levenshtein_distance(str1, str2) / max(len(str1), len(str2))
+
+
+@lru_cache(maxsize=2 ** 18)
+def _jaro_winkler(str1: str, str2: str) -> float:
+    """Port of jaroWinklerSimilarity (with jaroSimilarity inlined)."""
+    if str1 == str2:
+        return 1
+    if not str1 or not str2:
+        return 0
+    window = max(len(str1), len(str2)) // 2 - 1
+    matched1 = [False] * len(str1)
+    matched2 = [False] * len(str2)
+    matches = 0
+    for i, char in enumerate(str1):
+        for j in range(max(0, i - window), min(i + window + 1, len(str2))):
+            if matched2[j] or char != str2[j]:
+                continue
+            matched1[i] = matched2[j] = True
+            matches += 1
+            break
+    if matches == 0:
+        return 0
+
+    transpositions = 0
+    k = 0
+    for i, char in enumerate(str1):
+        if not matched1[i]:
+            continue
+        while not matched2[k]:
+            k += 1
+        if char != str2[k]:
+            transpositions += 1
+        k += 1
+    jaro = (matches / len(str1) + matches / len(str2) + (matches - transpositions / 2) / matches) / 3
+
+    if jaro < 0.7:
+        return jaro
+    prefix = 0
+    for i in range(min(len(str1), len(str2), 4)):
+        if str1[i] != str2[i]:
+            break
+        prefix += 1
+    return jaro + 0.1 * prefix * (1 - jaro)
+
+
+def _phonetic_similarity(soundex1: str, soundex2: str) -> float:
+    if soundex1 == soundex2:
+        return 1
+    matches = sum(1 for a, b in zip(soundex1, soundex2) if a == b)
+    return matches / max(len(soundex1), len(soundex2))
+
+
+def _token_similarity(tokens1: Tuple[str, ...], tokens2: Tuple[str, ...]) -> float:
+    """Port of tokenBasedSimilarity: greedy best matches in both directions."""
+    if not tokens1 and not tokens2:
+        return 1
+    if not tokens1 or not tokens2:
+        return 0
+
+    matched = set()
+    total_similarity = 0
+    total_tokens = 0
+    for token1 in tokens1:
+        best_match = 0
+        best_token = ''
+        for token2 in tokens2:
+            if token2 in matched:
+                continue
+            similarity = _jaro_winkler(token1, token2)
+            if similarity > best_match:
+                best_match = similarity
+                best_token = token2
+        if best_match > 0.5:
+            total_similarity += best_match
+            if best_token:
+                matched.add(best_token)
+        total_tokens += 1
+
+    for token2 in tokens2:
+        if token2 in matched:
+            continue
+        best_match = 0
+        for token1 in tokens1:
+            best_match = max(best_match, _jaro_winkler(token1, token2))
+        if best_match > 0.5:
+            total_similarity += best_match
+        total_tokens += 1
+
+    return total_similarity / total_tokens
+
+
+class FuzzyText:
+    """What fuzzyMatch derives from one name, computed once per name and settings."""
+
+    __slots__ = ('normalized', 'key', 'ngrams', 'soundex', 'tokens')
+
+    def __init__(self, name: str, case_sensitive: bool, remove_stop_words: bool, n_gram_size: int):
+        self.normalized = normalize_text(name, case_sensitive, remove_stop_words)
+        self.key = create_aggressive_key(name)
+        padding = '#' * (n_gram_size - 1)
+        padded = padding + self.normalized + padding
+        self.ngrams = frozenset(padded[i:i + n_gram_size]
+                                for i in range(len(padded) - n_gram_size + 1))
+        self.soundex = soundex(self.normalized)
+        self.tokens = tuple(token for token in _JS_WHITESPACE_RUN.split(self.normalized) if token)
+
+
+@lru_cache(maxsize=2 ** 18)
+def _fuzzy_text(name: str, case_sensitive: bool, remove_stop_words: bool,
+                n_gram_size: int) -> FuzzyText:
+    return FuzzyText(name, case_sensitive, remove_stop_words, n_gram_size)
+
+
+def _n_gram_similarity(text1: FuzzyText, text2: FuzzyText) -> float:
+    if not text1.ngrams and not text2.ngrams:
+        return 1
+    if not text1.ngrams or not text2.ngrams:
+        return 0
+    shared = len(text1.ngrams & text2.ngrams)
+    return shared / (len(text1.ngrams) + len(text2.ngrams) - shared)
+
+
+@lru_cache(maxsize=2 ** 18)
+def _similarities(text1: FuzzyText, text2: FuzzyText) -> Tuple[float, float, float, float, float]:
+    """The five fuzzyMatch components for two prepared names."""
+    return (
+        _levenshtein_similarity(text1.normalized, text2.normalized),
+        _jaro_winkler(text1.normalized, text2.normalized),
+        _n_gram_similarity(text1, text2),
+        _phonetic_similarity(text1.soundex, text2.soundex),
+        _token_similarity(text1.tokens, text2.tokens),
+    )
+
+
+def _may_reach(text1: FuzzyText, text2: FuzzyText, weights: Tuple[float, ...], floor: float) -> bool:
+    """Whether the weighted score can reach ``floor``.
+
+    The n-gram and phonetic components are exact here; Levenshtein is bounded
+    by the length difference and the rest by 1.
+    """
+    length1, length2 = len(text1.normalized), len(text2.normalized)
+    if not length1 and not length2:
+        levenshtein = 1
+    elif not length1 or not length2:
+        levenshtein = 0
+    else:
+        levenshtein = 1 - abs(length1 - length2) / max(length1, length2)
+    bound = (levenshtein * weights[0] + weights[1] + _n_gram_similarity(text1, text2) * weights[2]
+             + _phonetic_similarity(text1.soundex, text2.soundex) * weights[3] + weights[4])
+    return bound >= floor - BOUND_EPSILON
+
+
+def fuzzy_match(name1: str, name2: str, config: Dict = FUZZY_MATCH_CONFIG,
+                floor: Optional[float] = None) -> Optional[Dict]:
+    """Port of fuzzyMatch.
+
+    With ``floor`` set, returns None instead when the weighted similarity
+    provably stays below it, skipping the expensive components.
+    """
+    options = (bool(config.get('caseSensitive')), bool(config.get('removeStopWords')),
+               config['nGramSize'])
+    text1 = _fuzzy_text(name1, *options)
+    text2 = _fuzzy_text(name2, *options)
+    normalized_names = {'name1': text1.normalized, 'name2': text2.normalized}
+
+    if text1.key == text2.key and text1.key:
+        return {
+            'similarity': 0.98,
+            'confidence': 'high',
+            'breakdown': dict(_KEY_MATCH_BREAKDOWN),
+            'normalizedNames': normalized_names,
+        }
+
+    weights = config['weights']
+    weights = (weights['levenshtein'], weights['jaroWinkler'], weights['nGram'],
+               weights['phonetic'], weights['tokenBased'])
+    if floor is not None and not _may_reach(text1, text2, weights, floor):
+        return None
+
+    levenshtein, jaro_winkler, n_gram, phonetic, token_based = _similarities(text1, text2)
+    weighted = (levenshtein * weights[0] + jaro_winkler * weights[1] + n_gram * weights[2]
+                + phonetic * weights[3] + token_based * weights[4])
+
+    if weighted >= 0.9:
+        confidence = 'high'
+    elif weighted >= 0.7:
+        confidence = 'medium'
+    else:
+        confidence = 'low'
+
+    return {
+        'similarity': weighted,
+        'confidence': confidence,
+        'breakdown': {
+            'levenshtein': levenshtein,
+            'jaroWinkler': jaro_winkler,
+            'nGram': n_gram,
+            'phonetic': phonetic,
+            'tokenBased': token_based,
+            'weighted': weighted,
+        },
+        'normalizedNames': normalized_names,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Brand normalization (port of src/services/brand-normalization.ts)
+# ---------------------------------------------------------------------------
+
+KNOWN_BRANDS = {
+    'Macallan': ['macallan', 'the macallan', 'macallen', 'maccallan', 'macallan distillery'],
+    'Glenfiddich': ['glenfiddich', 'glen fiddich', 'glenfidich', 'glenfiddich distillery'],
+    'Johnnie Walker': ['johnnie walker', 'johnny walker', 'johnie walker', 'johnnie walkers',
+                       'johnnie walker & sons', 'walker', 'j walker', 'jw'],
+    'Jack Daniels': ['jack daniels', 'jack daniel', "jack daniel's", 'jack daniels tennessee whiskey',
+                     'jack daniel distillery', 'jd', 'j.d.', "jack daniel's old no. 7"],
+    'Jameson': ['jameson', 'jameson irish whiskey', 'jameson distillery', 'john jameson'],
+    'Chivas Regal': ['chivas regal', 'chivas', 'chivas bros', 'chivas brothers'],
+    'Glenlivet': ['glenlivet', 'the glenlivet', 'glen livet', 'glenlivet distillery'],
+    'Balvenie': ['balvenie', 'the balvenie', 'balvenie distillery', 'david stewart balvenie'],
+    'Highland Park': ['highland park', 'highland park distillery', 'highland pk'],
+    'Ardbeg': ['ardbeg', 'ardbeg distillery', 'ardbeg islay'],
+    'Lagavulin': ['lagavulin', 'lagavulin distillery', 'lagavulin islay'],
+    'Laphroaig': ['laphroaig', 'laphroaig distillery', 'laphroaig islay'],
+    'Oban': ['oban', 'oban distillery', 'oban highland'],
+    'Talisker': ['talisker', 'talisker distillery', 'talisker skye'],
+    'Springbank': ['springbank', 'springbank distillery', 'springbank campbeltown'],
+    'Redbreast': ['redbreast', 'red breast', 'redbreast irish whiskey'],
+    'Bushmills': ['bushmills', 'old bushmills', 'bushmills irish whiskey', 'bushmills distillery'],
+    'Crown Royal': ['crown royal', 'crown', 'crown royal canadian whisky'],
+    'Canadian Club': ['canadian club', 'cc', 'c.c.', 'canadian club whisky'],
+    'Wild Turkey': ['wild turkey', 'wild turkey bourbon', 'wild turkey kentucky'],
+    'Buffalo Trace': ['buffalo trace', 'buffalo trace distillery', 'buffalo trace bourbon'],
+    'Makers Mark': ['makers mark', "maker's mark", 'makers mark bourbon', "maker's mark bourbon"],
+    'Woodford Reserve': ['woodford reserve', 'woodford', 'woodford reserve bourbon'],
+    'Four Roses': ['four roses', 'four roses bourbon', '4 roses'],
+    'Knob Creek': ['knob creek', 'knob creek bourbon', 'knob creek kentucky'],
+    'Bulleit': ['bulleit', 'bulleit bourbon', 'bulleit frontier whiskey'],
+    'Hennessy': ['hennessy', 'hennessey', 'hennessy cognac', 'jas hennessy'],
+    'Rémy Martin': ['remy martin', 'rémy martin', 'remy martin cognac', 'rémy martin cognac'],
+    'Martell': ['martell', 'martell cognac', 'martell & co'],
+    'Courvoisier': ['courvoisier', 'courvoisier cognac', 'courvoisier vs'],
+    'Elijah Craig': ['elijah craig', 'elijah craig bourbon', 'elijah craig small batch'],
+    'Eagle Rare': ['eagle rare', 'eagle rare bourbon', 'eagle rare 10'],
+    "Blanton's": ['blantons', "blanton's", 'blanton bourbon', "blanton's bourbon"],
+    'Weller': ['weller', 'w.l. weller', 'wl weller', 'weller bourbon'],
+    'Pappy Van Winkle': ['pappy van winkle', 'pappy', 'van winkle', 'pappy bourbon'],
+    'George T. Stagg': ['george t stagg', 'george t. stagg', 'stagg', 'george stagg'],
+    'Nikka': ['nikka', 'nikka whisky', 'nikka japanese whisky'],
+    'Suntory': ['suntory', 'suntory whisky', 'suntory japanese whisky'],
+    'Hibiki': ['hibiki', 'hibiki whisky', 'hibiki japanese whisky'],
+    'Yamazaki': ['yamazaki', 'yamazaki whisky', 'yamazaki single malt'],
+    'Hakushu': ['hakushu', 'hakushu whisky', 'hakushu single malt'],
+}
+
+ABBREVIATIONS = {
+    'co': 'company',
+    'corp': 'corporation',
+    'inc': 'incorporated',
+    'ltd': 'limited',
+    'llc': 'limited liability company',
+    'bros': 'brothers',
+    'distillery': 'distillery',
+    'dist': 'distillery',
+    'yr': 'year',
+    'yrs': 'years',
+    'yo': 'year old',
+    'aged': 'aged',
+    'single': 'single',
+    'malt': 'malt',
+    'grain': 'grain',
+    'blend': 'blend',
+    'blended': 'blended',
+    'reserve': 'reserve',
+    'special': 'special',
+    'limited': 'limited',
+    'edition': 'edition',
+    'islay': 'islay',
+    'speyside': 'speyside',
+    'highland': 'highland',
+    'lowland': 'lowland',
+    'campbeltown': 'campbeltown',
+    'kentucky': 'kentucky',
+    'tennessee': 'tennessee',
+    'irish': 'irish',
+    'scottish': 'scottish',
+    'scotch': 'scotch',
+    'canadian': 'canadian',
+    'whisky': 'whisky',
+    'whiskey': 'whiskey',
+    'bourbon': 'bourbon',
+    'rye': 'rye',
+    'cognac': 'cognac',
+    'brandy': 'brandy',
+    'rum': 'rum',
+    'gin': 'gin',
+    'vodka': 'vodka',
+    'tequila': 'tequila',
+}
+
+BRAND_STOP_WORDS = frozenset([
+    'the', 'distillery', 'company', 'corporation', 'inc', 'ltd', 'llc', 'co',
+    'whisky', 'whiskey', 'bourbon', 'scotch', 'irish', 'canadian', 'tennessee',
+    'kentucky', 'single', 'malt', 'grain', 'blended', 'blend',
+])
+
+
+def _create_brand_lookup() -> Dict[str, str]:
+    lookup = {}
+    for canonical, variations in KNOWN_BRANDS.items():
+        lookup[canonical.lower()] = canonical
+        for variation in variations:
+            lookup[variation.lower()] = canonical
+    return lookup
+
+
+BRAND_LOOKUP = _create_brand_lookup()
+
+_NOT_WORD_CHAR = js_regex(r'[^\w]')
+_END_OF_LINE = '[^\n\r\u2028\u2029]*'
+CORE_BRAND_PATTERNS = [
+    js_regex(r'\s+(distillery|company|corporation|inc|ltd|llc|co\.?)\Z', re.I),
+    js_regex(r'\s+(whisky|whiskey|bourbon|scotch|irish|canadian)\Z', re.I),
+    js_regex(r'\s+(single\s+malt|blended|aged?\s+\d+)' + _END_OF_LINE + r'\Z', re.I),
+]
+CONFIDENCE_ORDER = {'low': 0, 'medium': 1, 'high': 2}
+
+
+def _brand_similarity(str1: str, str2: str) -> float:
+    """Port of calculateSimilarity (brand-normalization.ts)."""
+    if str1 == str2:
+        return 1.0
+    longer, shorter = (str1, str2) if len(str1) > len(str2) else (str2, str1)
+    if not longer:
+        return 1.0
+    return (len(longer) - _levenshtein_distance(longer, shorter)) / len(longer)
+
+
+def _find_best_brand_match(normalized_name: str) -> Optional[Tuple[str, float]]:
+    """Port of findBestBrandMatch; pairs whose length ratio caps the score are skipped."""
+    lower_name = normalized_name.lower()
+    exact = BRAND_LOOKUP.get(lower_name)
+    if exact:
+        return exact, 1.0
+
+    best = None
+    for variation, canonical in BRAND_LOOKUP.items():
+        longest = max(len(lower_name), len(variation))
+        if longest and min(len(lower_name), len(variation)) / longest <= 0.8:
+            continue
+        similarity = _brand_similarity(lower_name, variation)
+        if similarity > 0.8 and (best is None or similarity > best[1]):
+            best = canonical, similarity
+    return best
+
+
+def normalize_brand_name(brand_name: str, config: Dict = BRAND_CONFIG) -> Dict:
+    """Port of normalizeBrandName. The result is cached and shared; do not mutate it."""
+    return _normalize_brand_name(brand_name, bool(config.get('normalizeCase')),
+                                 bool(config.get('expandAbbreviations')),
+                                 config.get('minimumConfidence'))
+
+
+@lru_cache(maxsize=2 ** 16)
+def _normalize_brand_name(brand_name: str, normalize_case: bool, expand_abbreviations: bool,
+                          minimum_confidence: Optional[str]) -> Dict:
+    if not brand_name or not js_trim(brand_name):
+        return {
+            'normalized': '',
+            'canonical': '',
+            'confidence': 'low',
+            'transformations': ['empty_input'],
+            'isKnownBrand': False,
+        }
+
+    transformations = []
+    normalized = js_trim(brand_name)
+
+    if normalize_case:
+        normalized = js_collapse(_NON_WORD.sub(' ', normalized.lower()))
+        transformations.append('normalize_case')
+
+    if expand_abbreviations:
+        expanded = ' '.join(ABBREVIATIONS.get(_NOT_WORD_CHAR.sub('', word.lower())) or word
+                            for word in _JS_WHITESPACE_RUN.split(normalized))
+        if expanded != normalized:
+            normalized = expanded
+            transformations.append('expand_abbreviations')
+
+    without_stop_words = ' '.join(word for word in _JS_WHITESPACE_RUN.split(normalized)
+                                  if word.lower() not in BRAND_STOP_WORDS)
+    if without_stop_words != normalized:
+        normalized = without_stop_words
+        transformations.append('remove_stop_words')
+
+    core_name = normalized
+    for pattern in CORE_BRAND_PATTERNS:
+        core_name = pattern.sub('', core_name, count=1)
+    core_name = js_trim(core_name)
+    if core_name != normalized:
+        normalized = core_name
+        transformations.append('extract_core_name')
+
+    brand_match = _find_best_brand_match(normalized)
+    canonical = normalized
+    is_known_brand = False
+    if brand_match:
+        canonical, score = brand_match
+        is_known_brand = True
+        transformations.append('canonical_lookup')
+        if score >= 0.95:
+            confidence = 'high'
+        elif score >= 0.8:
+            confidence = 'medium'
+        else:
+            confidence = 'low'
+    else:
+        if not normalize_case:
+            canonical = js_trim(brand_name)
+        confidence = 'medium' if len(transformations) <= 1 else 'low'
+
+    if (minimum_confidence in CONFIDENCE_ORDER
+            and CONFIDENCE_ORDER[confidence] < CONFIDENCE_ORDER[minimum_confidence]):
+        return {
+            'normalized': js_trim(brand_name),
+            'canonical': js_trim(brand_name),
+            'confidence': 'low',
+            'transformations': ['insufficient_confidence'],
+            'isKnownBrand': False,
+        }
+
+    return {
+        'normalized': normalized,
+        'canonical': canonical,
+        'confidence': confidence,
+        'transformations': transformations,
+        'isKnownBrand': is_known_brand,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Per-spirit features and compareSpirits (deduplication-service.ts)
+# ---------------------------------------------------------------------------
+
+_ATTR_AGE = js_regex(r'(\d+)\s*-?\s*year', re.I)
+_ATTR_PROOF = js_regex(r'(\d+(?:\.\d+)?)\s*(?:proof|pf)', re.I)
+_ATTR_VINTAGE = js_regex(r'\b(19\d{2}|20\d{2})\b')
+_ATTR_RELEASE = js_regex(r'(\d{4})\s*release', re.I)
+CASK_TYPES = ('sherry', 'bourbon', 'port', 'madeira', 'rum', 'wine')
+
+
+def extract_attributes(spirit: Dict) -> Dict:
+    """Port of DeduplicationService.extractAttributes."""
+    attributes = {}
+    full_name = f"{spirit.get('brand') or ''} {spirit['name']}".lower()
+
+    age_match = _ATTR_AGE.search(full_name)
+    if age_match:
+        attributes['age'] = int(age_match.group(1))
+
+    proof_match = _ATTR_PROOF.search(full_name)
+    if proof_match:
+        attributes['proof'] = float(proof_match.group(1))
+    elif spirit.get('abv'):
+        attributes['proof'] = spirit['abv'] * 2
+
+    for grain in ('rye', 'wheat', 'corn', 'barley'):
+        if grain in full_name:
+            attributes['grainType'] = grain
+            break
+
+    for cask in CASK_TYPES:
+        if cask in full_name:
+            attributes['caskType'] = cask
+            break
+
+    vintage_match = _ATTR_VINTAGE.search(full_name)
+    if vintage_match and 'release' not in full_name:
+        attributes['vintage'] = int(vintage_match.group(1))
+
+    release_match = _ATTR_RELEASE.search(full_name)
+    if release_match:
+        attributes['release'] = release_match.group(1)
+
+    if 'limited edition' in full_name or 'special edition' in full_name:
+        attributes['edition'] = 'limited'
+
+    attributes['isLiqueur'] = 'liqueur' in full_name or 'cream' in full_name
+    attributes['isCaskStrength'] = 'cask strength' in full_name or 'barrel proof' in full_name
+    attributes['isSingleBarrel'] = 'single barrel' in full_name or 'single cask' in full_name
+
+    return attributes
+
+
+def attribute_penalty(attrs1: Dict, attrs2: Dict, config: Dict) -> float:
+    """Port of DeduplicationService.calculateAttributePenalty."""
+    penalty = 0
+
+    if 'age' in attrs1 and 'age' in attrs2 and attrs1['age'] != attrs2['age']:
+        penalty += (config.get('agePenaltyWeight') or 0.3) * min(1, abs(attrs1['age'] - attrs2['age']) / 10)
+
+    if 'proof' in attrs1 and 'proof' in attrs2:
+        proof_diff = abs(attrs1['proof'] - attrs2['proof'])
+        if proof_diff > 2:
+            penalty += (config.get('proofPenaltyWeight') or 0.2) * min(1, proof_diff / 50)
+
+    if attrs1.get('grainType') and attrs2.get('grainType') and attrs1['grainType'] != attrs2['grainType']:
+        penalty += config.get('grainTypePenaltyWeight') or 0.25
+
+    if attrs1.get('isLiqueur') != attrs2.get('isLiqueur'):
+        penalty += 0.3
+    if attrs1.get('isCaskStrength') != attrs2.get('isCaskStrength'):
+        penalty += 0.15
+    if attrs1.get('isSingleBarrel') != attrs2.get('isSingleBarrel'):
+        penalty += 0.1
+
+    if attrs1.get('vintage') and attrs2.get('vintage') and attrs1['vintage'] != attrs2['vintage']:
+        penalty += 0.2
+
+    if attrs1.get('release') and attrs2.get('release') and attrs1['release'] != attrs2['release']:
+        penalty += 0.05
+
+    return min(1, penalty)
+
+
+def _lower_or_none(value) -> Optional[str]:
+    """`value?.toLowerCase()`"""
+    return value.lower() if isinstance(value, str) else None
+
+
+TFIDF_STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'is', 'are', 'was', 'were', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'them', 'their',
+])
+
+
+def _tokenize(text: str) -> List[str]:
+    """Port of FuzzyMatchDeduplicationService.tokenize."""
+    return [term for term in _JS_WHITESPACE_RUN.split(_NON_WORD.sub(' ', text.lower()))
+            if js_length(term) > 2 and term not in TFIDF_STOP_WORDS]
+
+
+def _tfidf_terms(spirit: Dict) -> List[str]:
+    """Port of FuzzyMatchDeduplicationService.extractTerms."""
+    terms = []
+    if spirit.get('name'):
+        terms += _tokenize(spirit['name'])
+    if spirit.get('brand'):
+        terms += _tokenize(spirit['brand'])
+    description = spirit.get('description')
+    if description and js_length(description) >= FUZZY_DEDUP_CONFIG['minDescriptionLength']:
+        terms += _tokenize(description)
+    if spirit.get('type'):
+        terms.append(spirit['type'].lower())
+    if spirit.get('category'):
+        terms.append(spirit['category'].lower())
+    return terms
+
+
+class SpiritFeatures:
+    """Matching features derived from one spirit, computed once up front."""
+
+    __slots__ = ('index', 'spirit', 'keys', 'variant', 'attributes', 'lower_brand', 'lower_type',
+                 'term_counts', 'term_total')
+
+    def __init__(self, index: int, spirit: Dict, extract: bool = True):
+        self.index = index
+        self.spirit = spirit
+        self.keys = create_multiple_keys(spirit['name'])
+        self.variant = extract_variant_info(spirit['name'])
+        self.attributes = extract_attributes(spirit) if extract else {}
+        self.lower_brand = _lower_or_none(spirit.get('brand'))
+        self.lower_type = _lower_or_none(spirit.get('type'))
+        terms = _tfidf_terms(spirit)
+        self.term_counts = {}
+        for term in terms:
+            self.term_counts[term] = self.term_counts.get(term, 0) + 1
+        self.term_total = len(terms)
+
+
+def compare_spirits(f1: SpiritFeatures, f2: SpiritFeatures, config: Dict) -> Optional[Dict]:
+    """Port of DeduplicationService.compareSpirits.
+
+    The name fuzzy match is skipped once it provably cannot lift the final
+    score to the threshold.
+    """
+    has_exact_normalized_match = (f1.keys[0] == f2.keys[0] or f1.keys[1] == f2.keys[1]
+                                  or f1.keys[2] == f2.keys[2])
+
+    attrs1, attrs2 = f1.attributes, f2.attributes
+    penalty = attribute_penalty(attrs1, attrs2, config)
+    if penalty > 0.7 and not has_exact_normalized_match:
+        return None
+
+    brand_score = 0
+    brand_weight = config.get('differentBrandWeight') or 0.4
+    brand_match = None
+    is_same_brand = False
+    brand1, brand2 = f1.spirit.get('brand'), f2.spirit.get('brand')
+    if brand1 and brand2:
+        brand1_norm = normalize_brand_name(brand1, config['brandConfig'])
+        brand2_norm = normalize_brand_name(brand2, config['brandConfig'])
+        brand_match = brand1_norm
+        if brand1_norm['canonical'] == brand2_norm['canonical']:
+            brand_score = 1.0
+            brand_weight = config.get('sameBrandWeight') or 0.15
+            is_same_brand = True
+        else:
+            brand_score = fuzzy_match(brand1_norm['canonical'], brand2_norm['canonical'],
+                                      config['fuzzyConfig'])['similarity']
+    name_weight = 1 - brand_weight
+
+    bonus = 0
+    if attrs1.get('age') is not None and attrs1.get('age') == attrs2.get('age'):
+        bonus += 0.02
+    if attrs1.get('grainType') is not None and attrs1.get('grainType') == attrs2.get('grainType'):
+        bonus += 0.02
+    threshold = 0.5 if is_same_brand else config['combinedThreshold']
+
+    floor = None
+    if not has_exact_normalized_match and penalty < 1 and name_weight > 0:
+        floor = ((threshold - bonus) / (1 - penalty) - brand_score * brand_weight) / name_weight
+    name_match = fuzzy_match(f1.spirit['name'], f2.spirit['name'], config['fuzzyConfig'], floor)
+    if name_match is None:
+        return None
+    if has_exact_normalized_match:
+        name_match['similarity'] = max(name_match['similarity'], 0.95)
+    name_similarity = name_match['similarity']
+
+    base_score = name_similarity * name_weight + brand_score * brand_weight
+    final_score = min(1.0, base_score * (1 - penalty) + bonus)
+    if final_score < threshold:
+        return None
+
+    if name_similarity >= 0.95 and brand_score >= 0.95 and penalty < 0.1:
+        match_type = 'exact'
+    elif brand_score == 1.0:
+        match_type = 'fuzzy_brand'
+    elif name_similarity >= config['nameThreshold']:
+        match_type = 'fuzzy_name'
+    else:
+        match_type = 'combined'
+
+    if final_score >= 0.95 and penalty < 0.1:
+        confidence = 'high'
+    elif final_score >= 0.85 and penalty < 0.2:
+        confidence = 'medium'
+    else:
+        confidence = 'low'
+
+    if final_score >= config['autoMergeThreshold'] and confidence == 'high':
+        recommended_action = 'merge'
+    elif final_score >= config['combinedThreshold']:
+        recommended_action = 'flag_for_review'
+    else:
+        recommended_action = 'ignore'
+
+    return {
+        'spirit1': f1.spirit,
+        'spirit2': f2.spirit,
+        'similarity': final_score,
+        'confidence': confidence,
+        'matchType': match_type,
+        'details': _compact({
+            'nameMatch': name_match,
+            'brandMatch': brand_match,
+            'combinedScore': final_score,
+        }),
+        'recommendedAction': recommended_action,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Exact-match groups (port of exact-match-deduplication.ts)
+# ---------------------------------------------------------------------------
+
+def _group_score(group: List[SpiritFeatures]) -> float:
+    """Port of ExactMatchDeduplicationService.calculateGroupScore."""
+    score = min(1, len(group) / 5)
+
+    brands = [f.lower_brand for f in group if f.lower_brand]
+    if len(set(brands)) == 1 and len(brands) == len(group):
+        score += 0.2
+    types = [f.lower_type for f in group if f.lower_type]
+    if len(set(types)) == 1 and len(types) == len(group):
+        score += 0.1
+
+    if any(f.variant.get('size') for f in group):
+        score += 0.1
+    if any(f.variant.get('year') for f in group):
+        score += 0.1
+    if any(f.variant.get('giftSet') for f in group):
+        score += 0.1
+
+    return min(1, score)
+
+
+def find_exact_duplicates(block: List[SpiritFeatures]) -> List[List[SpiritFeatures]]:
+    """Groups sharing an aggressive normalized key, best-scored first (findExactDuplicates)."""
+    groups = {}
+    for feature in block:
+        groups.setdefault(feature.keys[1], []).append(feature)
+    duplicate_groups = [group for group in groups.values() if len(group) >= 2]
+    return sorted(duplicate_groups, key=lambda group: -_group_score(group))
+
+
+# ---------------------------------------------------------------------------
+# Fuzzy candidates (port of fuzzy-match-deduplication.ts)
+# ---------------------------------------------------------------------------
+
+def _tfidf_vectors(eligible: List[SpiritFeatures]) -> List[Dict[str, float]]:
+    """calculateTFIDFVector for every spirit, with keys in JS property order."""
+    document_frequency = {}
+    for feature in eligible:
+        for term in feature.term_counts:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    total = len(eligible)
+    vectors = []
+    for feature in eligible:
+        vector = {}
+        for term in js_key_order(feature.term_counts):
+            vector[term] = (feature.term_counts[term] / feature.term_total
+                            * math.log(total / document_frequency[term]))
+        vectors.append(vector)
+    return vectors
+
+
+def _squared_magnitude(vector: Dict[str, float], order: Dict[str, float]) -> float:
+    """Sum of squares of ``vector`` in cosineSimilarity's order (``order``'s keys first)."""
+    total = 0
+    for term in order:
+        weight = vector.get(term)
+        if weight:
+            total += weight * weight
+    for term, weight in vector.items():
+        if term not in order:
+            total += weight * weight
+    return total
+
+
+def find_fuzzy_duplicates(block: List[SpiritFeatures], exclude_ids: set) -> List[Dict]:
+    """Port of findFuzzyDuplicates, returning dry-run 'fuzzy_name' matches.
+
+    Pairs are generated from an inverted index over non-zero TF-IDF terms:
+    a pair sharing none has a TF-IDF score of 0 and cannot reach either
+    threshold on name similarity alone under the default weights. Dot
+    products still accumulate in the TS order, so scores are identical.
+    """
+    settings = FUZZY_DEDUP_CONFIG
+    fuzzy_config = settings['fuzzyMatchConfig']
+    fuzzy_weight, tfidf_weight = settings['fuzzyWeight'], settings['tfidfWeight']
+    lowest_threshold = min(settings['sameBrandThreshold'], settings['differentBrandThreshold'])
+    best_fuzzy = max(0.98, sum(fuzzy_config['weights'].values()))
+
+    eligible = [f for f in block if f.spirit.get('id') not in exclude_ids]
+    vectors = _tfidf_vectors(eligible)
+    magnitudes = [_squared_magnitude(vector, {}) for vector in vectors]
+
+    postings = {}
+    for position, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            if weight:
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(position)
+                postings[term][1].append(weight)
+    every_pair = fuzzy_weight * best_fuzzy >= lowest_threshold - BOUND_EPSILON
+
+    candidates = []
+    for i, f1 in enumerate(eligible):
+        vector1 = vectors[i]
+        dots = dict.fromkeys(range(i + 1, len(eligible)), 0) if every_pair else {}
+        for term, weight1 in vector1.items():
+            if not weight1:
+                continue
+            positions, weights = postings[term]
+            for index in range(bisect_right(positions, i), len(positions)):
+                j = positions[index]
+                dots[j] = dots.get(j, 0) + weight1 * weights[index]
+
+        for j in sorted(dots):
+            f2 = eligible[j]
+            brand_match = f1.lower_brand == f2.lower_brand
+            threshold = settings['sameBrandThreshold'] if brand_match else settings['differentBrandThreshold']
+            dot = dots[j]
+            if magnitudes[i] == 0 or magnitudes[j] == 0:
+                tfidf_score = 0
+            else:
+                tfidf_score = dot / (math.sqrt(magnitudes[i]) * math.sqrt(magnitudes[j]))
+                if fuzzy_weight * best_fuzzy + tfidf_score * tfidf_weight < threshold - BOUND_EPSILON:
+                    continue
+                magnitude2 = _squared_magnitude(vectors[j], vector1)
+                tfidf_score = dot / (math.sqrt(magnitudes[i]) * math.sqrt(magnitude2))
+            if fuzzy_weight * best_fuzzy + tfidf_score * tfidf_weight < threshold - BOUND_EPSILON:
+                continue
+            if f1.keys[1] == f2.keys[1]:
+                continue
+
+            floor = (threshold - tfidf_score * tfidf_weight) / fuzzy_weight if fuzzy_weight > 0 else None
+            name_match = fuzzy_match(f1.spirit['name'], f2.spirit['name'], fuzzy_config, floor)
+            if name_match is None:
+                continue
+            combined_score = name_match['similarity'] * fuzzy_weight + tfidf_score * tfidf_weight
+            if combined_score < threshold:
+                continue
+
+            variant1, variant2 = f1.variant, f2.variant
+            variant_differences = sum(1 for field in ('size', 'year', 'giftSet', 'proof')
+                                      if variant1.get(field) != variant2.get(field))
+            type_match = f1.lower_type == f2.lower_type
+
+            if combined_score >= 0.9 and brand_match and type_match:
+                confidence = 'high'
+            elif combined_score >= 0.8:
+                confidence = 'medium'
+            else:
+                confidence = 'low'
+
+            candidates.append({
+                'spirit1': f1.spirit,
+                'spirit2': f2.spirit,
+                'similarity': combined_score,
+                'confidence': confidence,
+                'matchType': 'fuzzy_name',
+                'details': {
+                    'nameMatch': name_match,
+                    'combinedScore': combined_score,
+                },
+                'recommendedAction': ('merge' if confidence == 'high' and variant_differences <= 1
+                                      else 'flag_for_review'),
+            })
+
+    candidates.sort(key=lambda candidate: -candidate['similarity'])
+    return candidates
+
+
+# ---------------------------------------------------------------------------
+# Blocking (port of blocking-deduplication.ts)
+# ---------------------------------------------------------------------------
+
+class SpiritBlock:
+    """A keyed group of spirits that are compared with each other."""
+
+    __slots__ = ('key', 'confidence', 'spirits')
+
+    def __init__(self, key: str, confidence: float, spirits: List[SpiritFeatures]):
+        self.key = key
+        self.confidence = confidence
+        self.spirits = spirits
+
+
+_BRAND_SUFFIXES = js_regex(r'distillery|distilleries|brewing|brewery|spirits', re.I)
+
+
+def normalize_brand(brand: str) -> str:
+    """Port of BlockingDeduplicationService.normalizeBrand."""
+    return _BRAND_SUFFIXES.sub('', _NON_ALNUM.sub('', js_trim(brand.lower())))
+
+
+def name_prefix(name: str) -> str:
+    """First four alphanumeric characters of the name, used for prefix blocks."""
+    return _NON_ALNUM.sub('', js_trim(name.lower()))[:4]
+
+
+BLOCK_SOUNDEX_CODES = {
+    'b': '1', 'f': '1', 'p': '1', 'v': '1',
+    'c': '2', 'g': '2', 'j': '2', 'k': '2', 'q': '2', 's': '2', 'x': '2', 'z': '2',
+    'd': '3', 't': '3',
+    'l': '4',
+    'm': '5', 'n': '5',
+    'r': '6',
+}
+
+
+def blocking_soundex(name: str) -> str:
+    """Port of BlockingDeduplicationService.soundex (not the fuzzy-matching one)."""
+    chars = utf16_units(name.lower())
+    first = chars[0] if chars else 'undefined'
+    codes = [BLOCK_SOUNDEX_CODES.get(char, '') for char in chars]
+    encoded = ''.join(code for index, code in enumerate(codes)
+                      if index == 0 or code != codes[index - 1])
+    return (first + encoded + '000')[:4].upper()
+
+
+def ngram_fingerprint(text: str) -> str:
+    """Port of getNGramFingerprint: the first five sorted distinct 3-grams."""
+    normalized = _NON_ALNUM.sub('', text.lower())
+    ngrams = {normalized[i:i + BLOCK_NGRAM_SIZE]
+              for i in range(len(normalized) - BLOCK_NGRAM_SIZE + 1)}
+    return ''.join(sorted(ngrams)[:5])
+
+
+def _replace_all(text: str, replacements) -> str:
+    for pattern, replacement in replacements:
+        text = pattern.sub(replacement, text)
+    return js_collapse(text)
+
+
+SIZE_VARIANT_REPLACEMENTS = [(js_regex(pattern, re.I), '') for pattern in (
+    r'\b1\.75l\b',
+    r'\b1\.75\s*l\b',
+    r'\b1750ml\b',
+    r'\b(375|750|1000)ml?\b',
+    r'\b(0\.375|0\.75|1)l?\b',
+    r'\b(375ml|750ml|1l)\b',
+    r'\b(pint|quart|half\s*gallon|gallon)\b',
+    r'\b(50ml|100ml|200ml|350ml|500ml|700ml)\b',
+)]
+
+MARKETING_TEXT_REPLACEMENTS = [(js_regex(pattern, re.I), replacement) for pattern, replacement in (
+    (r'\bsmall[\s-]*batch\b', 'smallbatch'),
+    (r'\bsingle[\s-]*barrel\b', 'singlebarrel'),
+    (r'\bcask[\s-]*strength\b', 'caskstrength'),
+    (r'\bbottled[\s-]*in[\s-]*bond\b', 'bottledinbond'),
+    (r'\blimited[\s-]*edition\b', 'limitededition'),
+    (r'\bprivate[\s-]*selection\b', 'privateselection'),
+    (r'\bmaster[\s-]*distiller\b', 'masterdistiller'),
+    (r'\bdistillery[\s-]*exclusive\b', 'distilleryexclusive'),
+    (r'\b(premium|reserve|select|special|finest|quality|craft|artisan)\b', ''),
+)]
+
+YEAR_VARIANT_REPLACEMENTS = [
+    (js_regex(r'\b(19|20)\d{2}\b'), ''),
+    (js_regex(r'\b(vintage|release|bottled|distilled)\s*(19|20)\d{2}\b', re.I), ''),
+    (js_regex(r'\b(19|20)\d{2}\s*(vintage|release|bottled|distilled)\b', re.I), ''),
+    (js_regex(r'\b(19|20)\d{2}-(19|20)\d{2}\b'), ''),
+]
+
+_PROOF_TO_ABV = js_regex(r'\b(\d+(?:\.\d+)?)\s*proof\b', re.I)
+PROOF_NOTATION_REPLACEMENTS = [
+    (js_regex(r'\b(\d+(?:\.\d+)?)\s*%?\s*abv\b', re.I), r'\1abv'),
+    (js_regex(r'\b(\d+(?:\.\d+)?)\s*%\b', re.I), r'\1abv'),
+    (js_regex(r'\b\d+(?:\.\d+)?(abv|proof|%)\b', re.I), ''),
+]
+
+BASIC_NAME_REPLACEMENTS = [(js_regex(pattern, re.I), '') for pattern in (
+    r'\b(bourbon|whiskey|whisky|scotch|irish|american|tennessee|rye|single|malt|blended)\b',
+    r'\b(straight|bottled|distilled)\b',
+    r'\b\d+\s*(year|yr)s?\s*(old)?\b',
+    r'\b\d+(?:\.\d+)?\s*(proof|abv|%)\b',
+)]
+
+COMPATIBLE_TYPES = (
+    (('bourbon', 'american whiskey', 'tennessee whiskey'), 'american-whiskey'),
+    (('scotch', 'single malt', 'blended scotch'), 'scotch-whisky'),
+    (('irish',), 'irish-whiskey'),
+    (('japanese',), 'japanese-whisky'),
+    (('canadian',), 'canadian-whisky'),
+    (('rye',), 'rye-whiskey'),
+    (('whisk',), 'whiskey'),
+    (('gin',), 'gin'),
+    (('vodka',), 'vodka'),
+    (('rum',), 'rum'),
+    (('tequila',), 'tequila'),
+    (('brandy', 'cognac'), 'brandy'),
+)
+
+
+def normalize_size_variants(name: str) -> str:
+    return _replace_all(js_trim(name.lower()), SIZE_VARIANT_REPLACEMENTS)
+
+
+def normalize_marketing_text(name: str) -> str:
+    return _replace_all(js_trim(name.lower()), MARKETING_TEXT_REPLACEMENTS)
+
+
+def normalize_year_variants(name: str) -> str:
+    return _replace_all(js_trim(name.lower()), YEAR_VARIANT_REPLACEMENTS)
+
+
+def normalize_proof_notation(name: str) -> str:
+    text = _PROOF_TO_ABV.sub(lambda match: f"{js_number_str(float(match.group(1)) / 2)}abv",
+                             js_trim(name.lower()))
+    return _replace_all(text, PROOF_NOTATION_REPLACEMENTS)
+
+
+def compatible_type(spirit_type: str) -> str:
+    normalized = js_trim(spirit_type.lower())
+    for needles, compatible in COMPATIBLE_TYPES:
+        if any(needle in normalized for needle in needles):
+            return compatible
+    return normalized
+
+
+def normalize_basic_name(name: str) -> str:
+    return _replace_all(js_trim(name.lower()), BASIC_NAME_REPLACEMENTS)
+
+
+def _add_blocks(blocks: Dict[str, SpiritBlock], prefix: str, confidence: float,
+                groups: Dict[str, List[SpiritFeatures]]):
+    for key, members in groups.items():
+        if len(members) >= MIN_BLOCK_SIZE:
+            blocks[f"{prefix}:{key}"] = SpiritBlock(f"{prefix}:{key}", confidence, members)
+
+
+def _group_by(chunk: List[SpiritFeatures], key_of) -> Dict[str, List[SpiritFeatures]]:
+    groups = {}
+    for feature in chunk:
+        key = key_of(feature)
+        if key is not None:
+            groups.setdefault(key, []).append(feature)
+    return groups
+
+
+def _split_large_block(brand: str, members: List[SpiritFeatures], blocks: Dict[str, SpiritBlock]):
+    """Port of splitLargeBlock: name-sorted chunks at 80% of the maximum block size."""
+    members.sort(key=lambda feature: locale_sort_key(feature.spirit['name']))
+    chunk_size = math.ceil(MAX_BLOCK_SIZE * 0.8)
+    for chunk_index, start in enumerate(range(0, len(members), chunk_size)):
+        key = f"brand:{brand}:chunk{chunk_index}"
+        blocks[key] = SpiritBlock(key, 0.9, members[start:start + chunk_size])
+
+
+def _create_blocks_standard(chunk: List[SpiritFeatures]) -> Dict[str, SpiritBlock]:
+    """All blocking passes over one chunk, in the TS pass order."""
+    blocks = {}
+    brands = {f.index: normalize_brand(f.spirit['brand']) if f.spirit.get('brand') else ''
+              for f in chunk}
+
+    brand_groups = _group_by(chunk, lambda f: brands[f.index] if f.spirit.get('brand') else None)
+    for brand, members in brand_groups.items():
+        if len(members) < MIN_BLOCK_SIZE:
+            continue
+        if len(members) > MAX_BLOCK_SIZE:
+            _split_large_block(brand, members, blocks)
+        else:
+            blocks[f"brand:{brand}"] = SpiritBlock(f"brand:{brand}", 0.95, members)
+
+    for spirit_type, members in _group_by(chunk, lambda f: f.spirit.get('type') or 'Unknown').items():
+        if len(members) < MIN_BLOCK_SIZE:
+            continue
+        _add_blocks(blocks, 'type', 0.85, _group_by(
+            members, lambda f: f"{spirit_type}:{brands[f.index] if f.spirit.get('brand') else 'unknown'}"))
+
+    _add_blocks(blocks, 'prefix', 0.75,
+                _group_by(chunk, lambda f: name_prefix(f.spirit['name']) or None))
+    _add_blocks(blocks, 'soundex', 0.70, _group_by(
+        chunk, lambda f: (f"{blocking_soundex(f.spirit['name'])}:{brands[f.index]}" if brands[f.index]
+                          else blocking_soundex(f.spirit['name']))))
+    _add_blocks(blocks, 'ngram', 0.65,
+                _group_by(chunk, lambda f: ngram_fingerprint(f.spirit['name']) or None))
+    _add_blocks(blocks, 'size', 0.92, _group_by(
+        chunk, lambda f: f"{brands[f.index]}:{normalize_size_variants(f.spirit['name'])}"))
+    _add_blocks(blocks, 'marketing', 0.88, _group_by(
+        chunk, lambda f: f"{brands[f.index]}:{normalize_marketing_text(f.spirit['name'])}"))
+    _add_blocks(blocks, 'year', 0.85, _group_by(
+        chunk, lambda f: (f"{brands[f.index]}:{f.spirit.get('type') or 'Unknown'}:"
+                          f"{normalize_year_variants(f.spirit['name'])}")))
+    _add_blocks(blocks, 'proof', 0.90, _group_by(
+        chunk, lambda f: f"{brands[f.index]}:{normalize_proof_notation(f.spirit['name'])}"))
+    _add_blocks(blocks, 'typecompat', 0.80, _group_by(
+        chunk, lambda f: (f"{compatible_type(f.spirit.get('type') or 'Unknown')}:{brands[f.index]}:"
+                          f"{normalize_basic_name(f.spirit['name'])}")))
+    return blocks
+
+
+def create_blocks(features: List[SpiritFeatures]) -> Dict[str, SpiritBlock]:
+    """Port of createBlocks, including progressive blocking for large inputs.
+
+    Progressive mode blocks each chunk on its own and concatenates blocks
+    with the same key, as mergeBlocks does.
+    """
+    total = len(features)
+    if not (total > PROGRESSIVE_CHUNK_SIZE or total * 2 / 1024 > MEMORY_LIMIT_MB):
+        return _create_blocks_standard(features)
+
+    blocks = {}
+    for start in range(0, total, PROGRESSIVE_CHUNK_SIZE):
+        for key, block in _create_blocks_standard(features[start:start + PROGRESSIVE_CHUNK_SIZE]).items():
+            if key in blocks:
+                blocks[key].spirits.extend(block.spirits)
+            else:
+                blocks[key] = block
+    return blocks
+
+
+def calculate_reduction(total_spirits: int, blocks: Dict[str, SpiritBlock]) -> Dict:
+    """Port of BlockingDeduplicationService.calculateReduction."""
+    without_blocking = total_spirits * (total_spirits - 1) / 2
+    with_blocking = js_sum(len(b.spirits) * (len(b.spirits) - 1) / 2
+                           for b in blocks.values() if len(b.spirits) >= 2)
+    return {
+        'withoutBlocking': without_blocking,
+        'withBlocking': with_blocking,
+        'reductionPercentage': ((without_blocking - with_blocking) / without_blocking * 100
+                                if without_blocking else None),
+    }
+
+
+def blocks_in_processing_order(blocks: Dict[str, SpiritBlock]) -> List[SpiritBlock]:
+    """processBlocksInBatches order: confidence, then size, both descending (stable)."""
+    return sorted(blocks.values(), key=lambda block: (-block.confidence, -len(block.spirits)))
+
+
+# ---------------------------------------------------------------------------
+# Candidate matches (port of findAllDryRunMatches)
+# ---------------------------------------------------------------------------
+
+def source_url_matches(url_clusters: List[Dict], config: Dict,
+                       extract: bool = True) -> Tuple[List[Dict], set]:
+    """compareSpirits between rows scraped from the same product page.
+
+    A row only stays collapsed if it matches the first row of its cluster;
+    the others go back to blocking like any other row. Returns the matches
+    among the collapsed rows, tagged with ``details.sourceUrl``, and the
+    ids of the rows removed from the later stages.
+    """
+    matches = []
+    removed = set()
+    for cluster in url_clusters:
+        features = [SpiritFeatures(index, spirit, extract) for index, spirit in enumerate(cluster['spirits'])]
+        head = features[0]
+        confirmed = []
+        cluster_matches = []
+        for f in features[1:]:
+            match = compare_spirits(head, f, config)
+            if match:
+                confirmed.append(f)
+                cluster_matches.append(match)
+        for i, f1 in enumerate(confirmed):
+            for f2 in confirmed[i + 1:]:
+                match = compare_spirits(f1, f2, config)
+                if match:
+                    cluster_matches.append(match)
+        for match in cluster_matches:
+            match['details']['sourceUrl'] = cluster['canonical_url']
+        matches += cluster_matches
+        removed.update(id(f.spirit) for f in confirmed)
+    return matches, removed
+
+
+def find_all_dry_run_matches(features: List[SpiritFeatures], config: Dict,
+                             blocks: Optional[Dict[str, SpiritBlock]]) -> List[Dict]:
+    """Exact groups, compareSpirits and fuzzy candidates per block, or every pair.
+
+    As in TS, a pair found in several blocks is reported once per block;
+    compareSpirits results for repeated exact-group pairs are reused.
+    """
+    matches = []
+    if blocks is None:
+        for i, f1 in enumerate(features):
+            for f2 in features[i + 1:]:
+                match = compare_spirits(f1, f2, config)
+                if match:
+                    matches.append(match)
+        return matches
+
+    compared = {}
+    for block in blocks_in_processing_order(blocks):
+        if len(block.spirits) < 2:
+            continue
+
+        exact_groups = find_exact_duplicates(block.spirits)
+        for group in exact_groups:
+            for a, f1 in enumerate(group):
+                for f2 in group[a + 1:]:
+                    pair = (f1.index, f2.index)
+                    if pair not in compared:
+                        compared[pair] = compare_spirits(f1, f2, config)
+                    if compared[pair]:
+                        matches.append(compared[pair])
+
+        exclude_ids = {f.spirit.get('id') for group in exact_groups for f in group}
+        matches.extend(find_fuzzy_duplicates(block.spirits, exclude_ids))
+
+    return matches
+
+
+# ---------------------------------------------------------------------------
+# Price variation (port of price-variation-handler.ts)
+# ---------------------------------------------------------------------------
+
+PRICE_KEY_CONFIG = {'removeSize': True, 'removeYear': True}
+
+
+def _median(sorted_prices: List[float]) -> Optional[float]:
+    if not sorted_prices:
+        return None
+    mid = len(sorted_prices) // 2
+    if len(sorted_prices) % 2 == 0:
+        return (sorted_prices[mid - 1] + sorted_prices[mid]) / 2
+    return sorted_prices[mid]
+
+
+def _price_variation(price_data: List[Dict]) -> Dict:
+    """Port of calculatePriceVariation; statistics of an empty set are null, as in JSON."""
+    prices = [entry['price'] for entry in price_data]
+    if len(prices) >= MIN_PRICES_FOR_STATS:
+        median = _median(sorted(prices))
+        prices = [price for price in prices
+                  if 1 / OUTLIER_THRESHOLD <= price / median <= OUTLIER_THRESHOLD]
+
+    if not prices:
+        return {'min': None, 'max': None, 'average': None, 'median': None, 'count': 0,
+                'prices': price_data, 'standardDeviation': None, 'coefficientOfVariation': 0}
+
+    average = js_sum(prices) / len(prices)
+    standard_deviation = math.sqrt(js_sum((price - average) ** 2 for price in prices) / len(prices))
+    return {
+        'min': min(prices),
+        'max': max(prices),
+        'average': average,
+        'median': _median(sorted(prices)),
+        'count': len(prices),
+        'prices': price_data,
+        'standardDeviation': standard_deviation,
+        'coefficientOfVariation': standard_deviation / average if average > 0 else 0,
+    }
+
+
+def _primary_price_spirit(spirits: List[Dict], variation: Dict) -> Dict:
+    """Port of selectPrimarySpirit."""
+    def score(spirit):
+        total = 0
+        median = variation['median']
+        price = spirit.get('price')
+        if price and isinstance(price, (int, float)) and median is not None and median > 0:
+            total += (1 - min(abs(price - median) / median, 1)) * 0.4
+        for field in ('brand', 'description', 'image_url', 'abv', 'volume', 'origin_country'):
+            if spirit.get(field):
+                total += 0.1
+        return total
+
+    return sorted(spirits, key=lambda spirit: -score(spirit))[0]
+
+
+def _suggest_price_action(variation: Dict) -> str:
+    cv = variation['coefficientOfVariation']
+    if cv > MAX_COEFFICIENT_OF_VARIATION:
+        return 'likely_different_products'
+    if variation['count'] == 2 and cv > 0.3:
+        return 'flag_for_review'
+    if cv < 0.1:
+        return 'use_average'
+    return 'use_median'
+
+
+def analyze_price_groups(spirits: List[Dict]) -> List[Dict]:
+    """Port of PriceVariationHandler.analyzeByGroups."""
+    groups = {}
+    for spirit in spirits:
+        groups.setdefault(create_normalized_key(spirit['name'], PRICE_KEY_CONFIG), []).append(spirit)
+
+    now = time.time() * 1000
+    results = []
+    for key, group_spirits in groups.items():
+        price_data = [
+            {
+                'price': spirit['price'],
+                'source': spirit.get('source_url') or 'unknown',
+                'date': js_date_json(spirit.get('created_at') or now),
+            }
+            for spirit in group_spirits
+            if isinstance(spirit.get('price'), (int, float)) and not isinstance(spirit['price'], bool)
+            and spirit['price'] > 0
+        ]
+        if not price_data:
+            continue
+
+        variation = _price_variation(price_data)
+        results.append({
+            'normalizedKey': key,
+            'spirits': group_spirits,
+            'primarySpirit': _primary_price_spirit(group_spirits, variation),
+            'priceVariation': variation,
+            'suggestedAction': _suggest_price_action(variation),
+        })
+    return results
+
+
+def price_summary(groups: List[Dict]) -> Dict:
+    """Port of PriceVariationHandler.getPriceSummary."""
+    suggested_actions = {'use_average': 0, 'use_median': 0, 'flag_for_review': 0,
+                         'likely_different_products': 0}
+    for group in groups:
+        suggested_actions[group['suggestedAction']] += 1
+    cvs = [group['priceVariation']['coefficientOfVariation'] for group in groups]
+    return {
+        'totalGroups': len(groups),
+        'highVariationGroups': sum(1 for cv in cvs if cv > MAX_COEFFICIENT_OF_VARIATION),
+        'averageCoefficientOfVariation': js_sum(cvs) / len(groups) if groups else 0,
+        'suggestedActions': suggested_actions,
+    }
+
+# ---------------------------------------------------------------------------
+# Match enhancement (ports of the DryRunDeduplicationService helpers)
+# ---------------------------------------------------------------------------
+
+_ANALYSIS_AGE = js_regex(r'(\d+)\s*(?:year|yr)', re.I)
+_PRICE_RANGE = js_regex(r'\$?(\d+(?:\.\d+)?)')
+
+
+def _js_normalize(text: str) -> str:
+    return js_trim(_NON_WORD.sub('', text.lower()))
+
+
+def analyze_name_similarity(name1: str, name2: str) -> Dict:
+    normalized1 = _js_normalize(name1)
+    normalized2 = _js_normalize(name2)
+    tokens1 = _JS_WHITESPACE_RUN.split(normalized1)
+    tokens2 = _JS_WHITESPACE_RUN.split(normalized2)
+    set1, set2 = set(tokens1), set(tokens2)
+
+    matching_tokens = [token for token in tokens1 if token in set2]
+    differences = ([token for token in tokens1 if token not in set2]
+                   + [token for token in tokens2 if token not in set1])
+
+    return {
+        'original1': name1,
+        'original2': name2,
+        'normalized1': normalized1,
+        'normalized2': normalized2,
+        'similarity': len(set(matching_tokens)) / len(set1 | set2),
+        'matchingTokens': matching_tokens,
+        'differences': differences,
+    }
+
+
+def analyze_brand_similarity(brand1: str, brand2: str) -> Dict:
+    normalized1 = _js_normalize(brand1)
+    normalized2 = _js_normalize(brand2)
+    is_same_brand = normalized1 == normalized2 and len(normalized1) > 0
+
+    if is_same_brand:
+        similarity = 1.0
+    elif normalized1 and normalized2 and (normalized1 in normalized2 or normalized2 in normalized1):
+        similarity = 0.8
+    else:
+        similarity = 0.0
+
+    return {
+        'brand1': brand1,
+        'brand2': brand2,
+        'normalized1': normalized1,
+        'normalized2': normalized2,
+        'isSameBrand': is_same_brand,
+        'similarity': similarity,
+    }
+
+
+def _grain_type(name: str) -> Optional[str]:
+    lower = name.lower()
+    for grain in ('rye', 'wheat', 'corn', 'barley'):
+        if grain in lower:
+            return grain
+    return None
+
+
+def analyze_attributes(spirit1: Dict, spirit2: Dict) -> Dict:
+    def extract_age(name):
+        match = _ANALYSIS_AGE.search(name)
+        return int(match.group(1)) if match else None
+
+    def extract_proof(spirit):
+        if spirit.get('abv'):
+            return _js_number(spirit['abv'] * 2)
+        match = _ATTR_PROOF.search(spirit['name'])
+        return _js_number(float(match.group(1))) if match else None
+
+    age1, age2 = extract_age(spirit1['name']), extract_age(spirit2['name'])
+    proof1, proof2 = extract_proof(spirit1), extract_proof(spirit2)
+    both_proofs = proof1 is not None and proof2 is not None
+    type1, type2 = spirit1.get('type'), spirit2.get('type')
+    grain1, grain2 = _grain_type(spirit1['name']), _grain_type(spirit2['name'])
+
+    return {
+        'age': _compact({
+            'spirit1': age1,
+            'spirit2': age2,
+            'match': age1 == age2,
+            'penalty': (min(0.3, abs(age1 - age2) / 20)
+                        if age1 is not None and age2 is not None and age1 != age2 else 0),
+        }),
+        'proof': _compact({
+            'spirit1': proof1,
+            'spirit2': proof2,
+            'match': abs(proof1 - proof2) <= 2 if both_proofs else True,
+            'penalty': min(0.2, abs(proof1 - proof2) / 100) if both_proofs and abs(proof1 - proof2) > 2 else 0,
+        }),
+        'type': {
+            'spirit1': type1 or 'unknown',
+            'spirit2': type2 or 'unknown',
+            'match': (type1 or 'unknown') == (type2 or 'unknown'),
+            'penalty': 0.25 if type1 and type2 and type1 != type2 else 0,
+        },
+        'grainType': _compact({
+            'spirit1': grain1,
+            'spirit2': grain2,
+            'match': grain1 == grain2,
+            'penalty': 0.25 if grain1 and grain2 and grain1 != grain2 else 0,
+        }),
+    }
+
+
+def _extract_price(spirit: Dict) -> Optional[float]:
+    if isinstance(spirit.get('price_range'), str):
+        match = _PRICE_RANGE.search(spirit['price_range'])
+        if match:
+            return _js_number(float(match.group(1)))
+    return None
+
+
+def analyze_prices(spirit1: Dict, spirit2: Dict) -> Dict:
+    price1, price2 = _extract_price(spirit1), _extract_price(spirit2)
+    if not price1 or not price2:
+        return _compact({'price1': price1, 'price2': price2, 'priceCompatible': True})
+
+    difference = abs(price1 - price2)
+    variation = difference / ((price1 + price2) / 2) * 100
+    return {
+        'price1': price1,
+        'price2': price2,
+        'priceDifference': _js_number(difference),
+        'priceVariationPercentage': variation,
+        'priceCompatible': variation <= 20,
+    }
+
+
+def _completeness_score(spirit: Dict) -> int:
+    score = 0
+    if spirit.get('name'):
+        score += 2
+    if spirit.get('brand'):
+        score += 2
+    if spirit.get('description') and len(spirit['description']) > 50:
+        score += 3
+    for field in ('abv', 'type', 'category', 'origin_country', 'region', 'price_range', 'image_url'):
+        if spirit.get(field):
+            score += 1
+    if spirit.get('flavor_profile'):
+        score += 1
+    return score
+
+
+def _preview_merge_data(primary: Dict, secondary: Dict) -> Dict:
+    merged = dict(primary)
+
+    if not merged.get('description') and secondary.get('description'):
+        merged['description'] = secondary['description']
+    elif (merged.get('description') and secondary.get('description')
+          and len(secondary['description']) > len(merged['description'])):
+        merged['description'] = secondary['description']
+
+    for field in ('abv', 'type', 'category', 'origin_country', 'region', 'price_range', 'image_url'):
+        if not merged.get(field) and secondary.get(field):
+            merged[field] = secondary[field]
+
+    if secondary.get('flavor_profile'):
+        existing = set(merged.get('flavor_profile') or [])
+        new_flavors = [f for f in secondary['flavor_profile'] if f not in existing]
+        merged['flavor_profile'] = list(merged.get('flavor_profile') or []) + new_flavors
+
+    return merged
+
+
+def _data_improvements(primary: Dict, merged: Dict) -> List[str]:
+    improvements = []
+
+    if not primary.get('description') and merged.get('description'):
+        improvements.append('Added description')
+    elif (primary.get('description') and merged.get('description')
+          and len(merged['description']) > len(primary['description'])):
+        improvements.append('Enhanced description')
+
+    labels = [('abv', 'Added ABV'), ('origin_country', 'Added origin country'),
+              ('region', 'Added region'), ('price_range', 'Added price information'),
+              ('image_url', 'Added image')]
+    for field, label in labels:
+        if not primary.get(field) and merged.get(field):
+            improvements.append(label)
+
+    original_flavors = len(primary.get('flavor_profile') or [])
+    merged_flavors = len(merged.get('flavor_profile') or [])
+    if merged_flavors > original_flavors:
+        improvements.append(f"Added {merged_flavors - original_flavors} flavor profile entries")
+
+    return improvements
+
+
+def _potential_losses(primary: Dict, secondary: Dict) -> List[str]:
+    losses = []
+    labels = [('description', 'Alternative description will be lost'),
+              ('image_url', 'Alternative image URL will be lost'),
+              ('price_range', 'Alternative price information will be lost')]
+    for field, label in labels:
+        if secondary.get(field) and primary.get(field) and secondary[field] != primary[field]:
+            losses.append(label)
+    return losses
+
+
+def generate_merge_preview(spirit1: Dict, spirit2: Dict, name_analysis: Dict,
+                           brand_analysis: Dict) -> Dict:
+    primary = spirit1 if _completeness_score(spirit1) >= _completeness_score(spirit2) else spirit2
+    secondary = spirit2 if primary is spirit1 else spirit1
+    merged = _preview_merge_data(primary, secondary)
+
+    # shouldAutoMerge / shouldFlagForReview
+    if (name_analysis['similarity'] >= 0.95 and brand_analysis['isSameBrand']
+            and (spirit1.get('type') or '') == (spirit2.get('type') or '')):
+        action_type = 'merge'
+    elif (name_analysis['similarity'] >= 0.7
+          or (brand_analysis['isSameBrand'] and name_analysis['similarity'] >= 0.5)):
+        action_type = 'flag_for_review'
+    else:
+        action_type = 'ignore'
+
+    return {
+        'actionType': action_type,
+        'primarySpirit': primary,
+        'secondarySpirit': secondary,
+        'mergedData': merged,
+        'dataImprovements': _data_improvements(primary, merged),
+        'potentialLosses': _potential_losses(primary, secondary),
+    }
+
+
+def generate_confidence_explanation(match: Dict, analysis: Dict) -> str:
+    explanations = [
+        f"Overall similarity: {match['similarity'] * 100:.1f}%",
+        f"Name similarity: {analysis['nameAnalysis']['similarity'] * 100:.1f}%",
+    ]
+
+    if analysis['brandAnalysis']['isSameBrand']:
+        explanations.append('Same brand detected')
+    elif analysis['brandAnalysis']['similarity'] > 0:
+        explanations.append(f"Brand similarity: {analysis['brandAnalysis']['similarity'] * 100:.1f}%")
+
+    age = analysis['attributeAnalysis']['age']
+    if age['match']:
+        explanations.append('Age statements match')
+    elif age['penalty'] > 0:
+        explanations.append(f"Age mismatch penalty: {age['penalty'] * 100:.1f}%")
+
+    if analysis['attributeAnalysis']['type']['match']:
+        explanations.append('Spirit types match')
+    else:
+        explanations.append('Spirit types differ')
+
+    price = analysis['priceAnalysis']
+    if price['priceCompatible']:
+        explanations.append('Prices are compatible')
+    elif price.get('priceVariationPercentage'):
+        explanations.append(f"Price variation: {price['priceVariationPercentage']:.1f}%")
+
+    return '; '.join(explanations)
+
+
+def enhance_match(match: Dict, index: int) -> Dict:
+    spirit1, spirit2 = match['spirit1'], match['spirit2']
+    analysis = {
+        'nameAnalysis': analyze_name_similarity(spirit1['name'], spirit2['name']),
+        'brandAnalysis': analyze_brand_similarity(spirit1.get('brand') or '', spirit2.get('brand') or ''),
+        'attributeAnalysis': analyze_attributes(spirit1, spirit2),
+        'priceAnalysis': analyze_prices(spirit1, spirit2),
+    }
+    return {
+        **match,
+        'matchId': f"match_{index + 1}",
+        'analysisDetails': analysis,
+        'mergePreview': generate_merge_preview(spirit1, spirit2, analysis['nameAnalysis'],
+                                               analysis['brandAnalysis']),
+        'confidenceExplanation': generate_confidence_explanation(match, analysis),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Clusters, impact and report files
+# ---------------------------------------------------------------------------
+
+def _relationship(similarity: float) -> str:
+    if similarity >= 0.95:
+        return 'exact'
+    if similarity >= 0.85:
+        return 'high_similarity'
+    if similarity >= 0.7:
+        return 'medium_similarity'
+    return 'low_similarity'
+
+
+def _cluster_action(matches: List[Dict]) -> str:
+    high_confidence = sum(1 for m in matches if m['confidence'] == 'high')
+    if matches and high_confidence == len(matches):
+        return 'merge_all'
+    if high_confidence > 0:
+        return 'merge_high_confidence'
+    if matches:
+        return 'flag_for_review'
+    return 'no_action'
+
+
+def generate_similarity_clusters(matches: List[Dict]) -> List[Dict]:
+    """Connected components of the match graph, members in the BFS order TS uses."""
+    connections = {}
+    first_match = {}
+    for match in matches:
+        id1, id2 = match['spirit1']['id'], match['spirit2']['id']
+        for spirit_id in (id1, id2):
+            if spirit_id not in connections:
+                connections[spirit_id] = {}
+                first_match[spirit_id] = match
+        connections[id1][id2] = True
+        connections[id2][id1] = True
+
+    component_of = {}
+    components = []
+    for spirit_id in connections:
+        if spirit_id in component_of:
+            continue
+        members = {}
+        queue = deque([spirit_id])
+        while queue:
+            current = queue.popleft()
+            if current in members:
+                continue
+            members[current] = True
+            component_of[current] = len(components)
+            queue.extend(neighbor for neighbor in connections[current] if neighbor not in members)
+        components.append(list(members))
+
+    component_matches = [[] for _ in components]
+    for match in matches:
+        component_matches[component_of[match['spirit1']['id']]].append(match)
+
+    clusters = []
+    for member_ids, cluster_matches in zip(components, component_matches):
+        if len(member_ids) < 2 or not cluster_matches:
+            continue
+
+        members = []
+        for spirit_id in member_ids:
+            match = first_match[spirit_id]
+            spirit = match['spirit1'] if match['spirit1']['id'] == spirit_id else match['spirit2']
+            members.append({
+                'spirit': spirit,
+                'similarity': match['similarity'],
+                'relationship': _relationship(match['similarity']),
+            })
+
+        clusters.append({
+            'clusterId': f"cluster_{len(clusters) + 1}",
+            'centerSpirit': cluster_matches[0]['spirit1'],
+            'members': members,
+            'clusterSimilarity': js_sum(m['similarity'] for m in cluster_matches) / len(cluster_matches),
+            'recommendedAction': _cluster_action(cluster_matches),
+        })
+
+    return clusters
+
+
+def calculate_impact_assessment(matches: List[Dict], total_spirits: int) -> Dict:
+    spirits_to_be_removed = sum(1 for m in matches if m['recommendedAction'] == 'merge')
+    return {
+        'spiritsToBeRemoved': spirits_to_be_removed,
+        'dataFieldsToBeEnhanced': sum(len(m['mergePreview']['dataImprovements']) for m in matches),
+        'estimatedDuplicationReduction': spirits_to_be_removed / total_spirits * 100 if total_spirits else 0,
+        'potentialDataLoss': list(dict.fromkeys(
+            loss for m in matches for loss in m['mergePreview']['potentialLosses'])),
+        'dataQualityImprovements': list(dict.fromkeys(
+            improvement for m in matches for improvement in m['mergePreview']['dataImprovements'])),
+    }
+
+
+def generate_summary_text(report: Dict) -> str:
+    """Port of DryRunDeduplicationService.generateSummaryText."""
+    summary = report['summary']
+    impact = report['impactAssessment']
+    lines = [
+        'DRY-RUN DEDUPLICATION ANALYSIS SUMMARY',
+        '=' * 50,
+        '',
+        'OVERVIEW:',
+        f"  Total spirits analyzed: {summary['totalSpiritsAnalyzed']:,}",
+        f"  Total duplicates found: {summary['totalDuplicatesFound']}",
+        f"  Processing time: {summary['processingTime'] / 1000:.2f}s",
+        '',
+        'RECOMMENDED ACTIONS:',
+        f"  Auto-merge candidates: {summary['potentialMerges']}",
+        f"  Flag for review: {summary['flaggedForReview']}",
+        f"  Ignore (low confidence): {summary['ignoredDuplicates']}",
+        '',
+    ]
+
+    if report.get('sourceUrlPrefilter'):
+        prefilter = report['sourceUrlPrefilter']
+        lines += [
+            'SOURCE URL PRE-FILTER:',
+            f"  Product pages scraped more than once: {prefilter['duplicateGroups']}",
+            f"  Rows removed before blocking: {prefilter['rowsRemoved']} of {prefilter['rowsIn']:,}",
+            '',
+        ]
+
+    if report.get('blockingStats'):
+        stats = report['blockingStats']
+        lines += [
+            'BLOCKING OPTIMIZATION:',
+            f"  Total blocks created: {stats['totalBlocks']}",
+            f"  Comparison reduction: {stats['reductionPercentage']:.1f}%",
+            f"  Largest block size: {stats['largestBlockSize']} spirits",
+            '',
+        ]
+
+    lines += [
+        'IMPACT ASSESSMENT:',
+        f"  Spirits to be removed: {impact['spiritsToBeRemoved']}",
+        f"  Data fields to be enhanced: {impact['dataFieldsToBeEnhanced']}",
+        f"  Estimated duplication reduction: {impact['estimatedDuplicationReduction']:.1f}%",
+        f"  Estimated data quality improvement: {summary['estimatedDataQualityImprovement']:.1f}%",
+        '',
+    ]
+
+    if impact['dataQualityImprovements']:
+        lines.append('DATA QUALITY IMPROVEMENTS:')
+        lines += [f"  - {improvement}" for improvement in impact['dataQualityImprovements']]
+        lines.append('')
+
+    if impact['potentialDataLoss']:
+        lines.append('POTENTIAL DATA LOSS:')
+        lines += [f"  - {loss}" for loss in impact['potentialDataLoss']]
+        lines.append('')
+
+    lines.append('SIMILARITY CLUSTERS:')
+    lines.append(f"  Total clusters identified: {len(report['clusters'])}")
+    for index, cluster in enumerate(report['clusters']):
+        lines.append(f"  Cluster {index + 1}: {len(cluster['members'])} spirits, "
+                     f"avg similarity {cluster['clusterSimilarity'] * 100:.1f}%")
+        lines.append(f"    Recommended action: {cluster['recommendedAction'].replace('_', ' ')}")
+
+    return '\n'.join(lines)
+
+
+def _yes_no(value: bool) -> str:
+    return 'Yes' if value else 'No'
+
+
+def export_reports(report: Dict, export_dir: str) -> Dict[str, str]:
+    """Write the four dry-run report files with the TypeScript exporter's names and layout."""
+    os.makedirs(export_dir, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    timestamp = now.strftime('%Y-%m-%dT%H-%M-%S-') + f"{now.microsecond // 1000:03d}Z"
+
+    paths = {
+        'detailedReportJson': os.path.join(export_dir, f"dry-run-detailed-{timestamp}.json"),
+        'matchesCsv': os.path.join(export_dir, f"dry-run-matches-{timestamp}.csv"),
+        'clustersJson': os.path.join(export_dir, f"dry-run-clusters-{timestamp}.json"),
+        'summaryTxt': os.path.join(export_dir, f"dry-run-summary-{timestamp}.txt"),
+    }
+    report['exportPaths'] = paths
+
+    with open(paths['detailedReportJson'], 'w', encoding='utf-8') as f:
+        f.write(json.dumps(report, ensure_ascii=False))
+
+    # Same hand-built rows as the TS exporter so existing consumers parse them unchanged
+    csv_headers = ['Match ID', 'Spirit 1', 'Spirit 2', 'Similarity', 'Confidence', 'Action',
+                   'Name Similarity', 'Brand Match', 'Age Match', 'Type Match', 'Price Compatible']
+    with open(paths['matchesCsv'], 'w', encoding='utf-8') as f:
+        f.write(','.join(csv_headers))
+        for match in report['matches']:
+            details = match['analysisDetails']
+            row = [
+                match['matchId'],
+                f"\"{match['spirit1'].get('brand') or ''} {match['spirit1']['name']}\"",
+                f"\"{match['spirit2'].get('brand') or ''} {match['spirit2']['name']}\"",
+                f"{match['similarity'] * 100:.1f}%",
+                match['confidence'],
+                match['recommendedAction'],
+                f"{details['nameAnalysis']['similarity'] * 100:.1f}%",
+                _yes_no(details['brandAnalysis']['isSameBrand']),
+                _yes_no(details['attributeAnalysis']['age']['match']),
+                _yes_no(details['attributeAnalysis']['type']['match']),
+                _yes_no(details['priceAnalysis']['priceCompatible']),
+            ]
+            f.write('\n' + ','.join(row))
+
+    with open(paths['clustersJson'], 'w', encoding='utf-8') as f:
+        f.write(json.dumps(report['clusters'], ensure_ascii=False))
+
+    with open(paths['summaryTxt'], 'w', encoding='utf-8') as f:
+        f.write(generate_summary_text(report))
+
+    return paths
+
+
+def run_dry_run_analysis(spirits: List[Dict], export_dir: str = './dry-run-reports',
+                         use_blocking: bool = True, generate_visualizations: bool = True,
+                         custom_config: Optional[Dict] = None,
+                         source_url_prefilter: bool = False) -> Dict:
+    """Build and export a DryRunReport for ``spirits``.
+
+    With ``source_url_prefilter``, rows scraped from the same product page
+    that compareSpirits confirms are collapsed to one row before blocking,
+    as in analyze_duplicates_comprehensive.py, and their matches are
+    reported. It is off by default so the report matches the Node engine.
+    """
+    start_time = time.time()
+    config = {**DEFAULT_CONFIG, **(custom_config or {})}
+
+    extract = config.get('extractAttributes') is not False
+    remaining, url_matches = spirits, []
+    if source_url_prefilter:
+        _, url_clusters = collapse_source_url_duplicates(spirits)
+        url_matches, removed = source_url_matches(url_clusters, config, extract)
+        remaining = [spirit for spirit in spirits if id(spirit) not in removed]
+    features = [SpiritFeatures(index, spirit, extract) for index, spirit in enumerate(remaining)]
+
+    report = {
+        'summary': {
+            'totalSpiritsAnalyzed': len(spirits),
+            'totalDuplicatesFound': 0,
+            'potentialMerges': 0,
+            'flaggedForReview': 0,
+            'ignoredDuplicates': 0,
+            'processingTime': 0,
+            'estimatedDataQualityImprovement': 0,
+        },
+        'matches': [],
+        'clusters': [],
+        'impactAssessment': {},
+    }
+
+    if source_url_prefilter:
+        report['sourceUrlPrefilter'] = {
+            'rowsIn': len(spirits),
+            'rowsRemoved': len(spirits) - len(remaining),
+            'duplicateGroups': sum(1 for cluster in url_clusters
+                                   if any(id(spirit) in removed for spirit in cluster['spirits'])),
+        }
+
+    blocks = None
+    if use_blocking and len(remaining) > MIN_SPIRITS_FOR_BLOCKING:
+        blocks = create_blocks(features)
+        reduction = calculate_reduction(len(remaining), blocks)
+        block_sizes = [len(block.spirits) for block in blocks.values()]
+        report['blockingStats'] = {
+            'totalBlocks': len(blocks),
+            'reductionPercentage': reduction['reductionPercentage'],
+            'comparisonsWithoutBlocking': _js_number(reduction['withoutBlocking']),
+            'comparisonsWithBlocking': _js_number(reduction['withBlocking']),
+            # NaN and -Infinity for an empty block map serialize as null in JSON
+            'averageBlockSize': js_sum(block_sizes) / len(block_sizes) if block_sizes else None,
+            'largestBlockSize': max(block_sizes, default=None),
+        }
+
+    candidates = url_matches + find_all_dry_run_matches(features, config, blocks)
+    matches = [enhance_match(match, index) for index, match in enumerate(candidates)]
+
+    summary = report['summary']
+    summary['totalDuplicatesFound'] = len(matches)
+    summary['potentialMerges'] = sum(1 for m in matches if m['recommendedAction'] == 'merge')
+    summary['flaggedForReview'] = sum(1 for m in matches if m['recommendedAction'] == 'flag_for_review')
+    summary['ignoredDuplicates'] = sum(1 for m in matches if m['recommendedAction'] == 'ignore')
+    report['matches'] = matches
+
+    if generate_visualizations:
+        report['clusters'] = generate_similarity_clusters(matches)
+
+    price_groups = analyze_price_groups(spirits)
+    report['priceVariationAnalysis'] = {
+        'groups': price_groups,
+        'summary': price_summary(price_groups),
+    }
+
+    report['impactAssessment'] = calculate_impact_assessment(matches, len(spirits))
+    summary['estimatedDataQualityImprovement'] = min(
+        100, sum(len(m['mergePreview']['dataImprovements']) * 2 for m in matches))
+    summary['processingTime'] = round((time.time() - start_time) * 1000)
+
+    export_reports(report, export_dir)
+    return report
+
+
+def run_request(request_path: str) -> int:
+    """Serve one file-based request from the TypeScript CLI.
+
+    The request names ``input``, ``exportDir``, ``responsePath`` and the
+    options of runDryRunAnalysis. The response carries the report with at
+    most ``maxResponseMatches`` matches (highest similarity first); the
+    exported files always hold all of them.
+    """
+    with open(request_path, 'r', encoding='utf-8') as f:
+        request = json.load(f)
+
+    try:
+        report = run_dry_run_analysis(
+            load_spirits(request['input']),
+            export_dir=request.get('exportDir', './dry-run-reports'),
+            use_blocking=request.get('useBlocking', True),
+            generate_visualizations=request.get('generateVisualizations', True),
+            custom_config=request.get('customConfig'),
+            source_url_prefilter=request.get('sourceUrlPrefilter', False),
+        )
+        limit = request.get('maxResponseMatches')
+        if limit is not None and len(report['matches']) > limit:
+            report['matches'] = sorted(report['matches'], key=lambda m: -m['similarity'])[:limit]
+        response = {'status': 'ok', 'report': report}
+    except Exception as error:
+        traceback.print_exc()
+        response = {'status': 'error', 'error': f"{type(error).__name__}: {error}"}
+
+    with open(request['responsePath'], 'w', encoding='utf-8') as f:
+        json.dump(response, f, ensure_ascii=False)
+
+    return 0 if response['status'] == 'ok' else 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Batch dry-run deduplication analysis.')
+    parser.add_argument('input', nargs='?', help='Spirits CSV export, JSON array or JSONL file')
+    parser.add_argument('--request', help='File-based request from the TypeScript CLI')
+    parser.add_argument('-t', '--threshold', type=float, default=0.85, help='Similarity threshold (0-1)')
+    parser.add_argument('--export-dir', default='./dry-run-reports', help='Export directory for reports')
+    parser.add_argument('--no-blocking', action='store_true', help='Disable blocking optimization')
+    parser.add_argument('--no-visualizations', action='store_true', help='Skip similarity cluster generation')
+    parser.add_argument('--source-url-prefilter', action='store_true',
+                        help='Collapse rows scraped from the same product page before blocking')
+    args = parser.parse_args()
+
+    if args.request:
+        sys.exit(run_request(args.request))
+    if not args.input:
+        parser.error('an input file or --request is required')
+
+    report = run_dry_run_analysis(
+        load_spirits(args.input),
+        export_dir=args.export_dir,
+        use_blocking=not args.no_blocking,
+        generate_visualizations=not args.no_visualizations,
+        # Never auto-merge in dry-run, as in the `dry-run` CLI command
+        custom_config={'combinedThreshold': args.threshold, 'autoMergeThreshold': 1.0},
+        source_url_prefilter=args.source_url_prefilter,
+    )
+    print(generate_summary_text(report))
+    print("\n\nReports saved to:")
+    for path in report['exportPaths'].values():
+        print(f"  {path}")
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Diff duplicate groups between two spirits export snapshots.
+
+Each export is reduced once to (normalized key, row id, cluster id) records
+sorted by key, using an external merge sort so memory stays bounded. The
+sorted file is cached (keyed by the export's path, size and mtime) and
+reused, so today's export only has to be sorted once to serve as
+tomorrow's baseline. Two sorted snapshots are then compared with a
+streaming merge-join.
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from analyze_duplicates_comprehensive import normalize_name_aggressive
+
+
+# Bump when the key or record layout changes so stale caches are rebuilt
+SORTED_FORMAT_VERSION = 1
+
+# Records held in memory per sorted run
+SORT_CHUNK_SIZE = 500_000
+
+# Examples of each change kind kept in the JSON summary
+SUMMARY_EXAMPLES = 10
+
+csv.field_size_limit(2 ** 31 - 1)
+
+
+def snapshot_key(spirit: Dict) -> str:
+    """Build the within-brand duplicate key used by the comprehensive analysis."""
+    return f"{spirit['brand']}\x1f{normalize_name_aggressive(spirit['name'])}"
+
+
+def _write_run(records: List[Tuple[str, ...]], directory: str) -> str:
+    """Sort one chunk of records and spill it to a temporary run file."""
+    records.sort()
+    fd, path = tempfile.mkstemp(suffix='.csv', dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(records)
+    return path
+
+
+def _read_rows(path: str) -> Iterator[List[str]]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from csv.reader(f)
+
+
+def external_sort(records: Iterator[Tuple[str, ...]], output_path: str,
+                  chunk_size: int = SORT_CHUNK_SIZE) -> int:
+    """Sort (key, id, ...) records into ``output_path`` with a cluster id appended.
+
+    Records are sorted in chunks of ``chunk_size`` and the runs are
+    k-way merged. Each cluster is labelled with the smallest id sharing its
+    key, compared as a string ("10" sorts before "9"). The label only has to
+    be stable across snapshots; it is not necessarily the row a
+    deduplication would keep (the comprehensive analysis keeps the first
+    row in file order). Returns the number of records written.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    runs = []
+    written = 0
+    try:
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(chunk, directory))
+                chunk = []
+        if chunk:
+            runs.append(_write_run(chunk, directory))
+
+        merged = heapq.merge(*(map(tuple, _read_rows(run)) for run in runs))
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            for key, group in itertools.groupby(merged, key=lambda r: r[0]):
+                cluster_id = None
+                for record in group:
+                    # Runs are sorted by (key, id), so the first id is the smallest string
+                    if cluster_id is None:
+                        cluster_id = record[1]
+                    writer.writerow((*record, cluster_id))
+                    written += 1
+        os.replace(tmp_path, output_path)
+    finally:
+        for run in runs:
+            os.remove(run)
+
+    return written
+
+
+def sorted_snapshot_path(csv_file: str, cache_dir: str) -> str:
+    """Return the cache path for a snapshot, keyed by its path, size and mtime."""
+    stat = os.stat(csv_file)
+    fingerprint = hashlib.sha1(
+        f"{os.path.abspath(csv_file)}|{stat.st_size}|{stat.st_mtime_ns}|{SORTED_FORMAT_VERSION}".encode()
+    ).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(csv_file))[0]
+    return os.path.join(cache_dir, f"{stem}-{fingerprint}.sorted.csv")
+
+
+def sort_snapshot(csv_file: str, cache_dir: str = '.snapshot_cache') -> str:
+    """Sort a snapshot's records by key once and return the cached sorted file."""
+    output_path = sorted_snapshot_path(csv_file, cache_dir)
+    if os.path.exists(output_path):
+        return output_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        count = external_sort(((snapshot_key(row), row['id']) for row in reader), output_path)
+
+    print(f"Sorted {count} records from {csv_file} -> {output_path}")
+    return output_path
+
+
+def _key_groups(sorted_path: str) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (key, row ids) runs from a sorted snapshot file."""
+    for key, rows in itertools.groupby(_read_rows(sorted_path), key=lambda r: r[0]):
+        yield key, [row[1] for row in rows]
+
+
+def merge_join(old_path: str, new_path: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """Stream (key, old ids, new ids) for every key present in either sorted snapshot."""
+    old_groups = _key_groups(old_path)
+    new_groups = _key_groups(new_path)
+    old = next(old_groups, None)
+    new = next(new_groups, None)
+
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield old[0], old[1], []
+            old = next(old_groups, None)
+        elif old is None or new[0] < old[0]:
+            yield new[0], [], new[1]
+            new = next(new_groups, None)
+        else:
+            yield old[0], old[1], new[1]
+            old = next(old_groups, None)
+            new = next(new_groups, None)
+
+
+def classify_group(old_count: int, new_count: int) -> Optional[str]:
+    """Classify how a duplicate group (2+ rows under one key) changed, if at all."""
+    if new_count > 1 and old_count < 2:
+        return 'appeared'
+    if old_count > 1 and new_count < 2:
+        return 'resolved'
+    if old_count > 1 and new_count > old_count:
+        return 'grew'
+    if new_count > 1 and new_count < old_count:
+        return 'shrank'
+    return None
+
+
+def diff_snapshots(old_csv: str, new_csv: str, cache_dir: str = '.snapshot_cache',
+                   output_prefix: str = 'duplicate_snapshot_diff') -> Dict:
+    """Compare two exports and write added/removed/changed spirits and groups.
+
+    Full details are streamed to ``<output_prefix>_groups.csv`` and
+    ``<output_prefix>_spirits.csv``; the summary with a few examples per
+    change kind is returned and saved to ``<output_prefix>.json``.
+    """
+    old_sorted = sort_snapshot(old_csv, cache_dir)
+    new_sorted = sort_snapshot(new_csv, cache_dir)
+
+    group_counts = {'appeared': 0, 'grew': 0, 'shrank': 0, 'resolved': 0}
+    group_examples = {kind: [] for kind in group_counts}
+    totals = {'old_spirits': 0, 'new_spirits': 0, 'old_groups': 0, 'new_groups': 0}
+
+    # Rows whose id only shows up under one side of a key; pairing them up by
+    # id afterwards tells moved (renamed/rebranded) rows from real adds/removes.
+    # They are spilled to disk and sorted externally so a mass rename cannot
+    # blow up memory.
+    os.makedirs(cache_dir, exist_ok=True)
+    moves_base = os.path.join(cache_dir, os.path.basename(output_prefix))
+    moves_path = f"{moves_base}-moves.csv"
+    sorted_moves_path = f"{moves_base}-moves.sorted.csv"
+
+    with open(f"{output_prefix}_groups.csv", 'w', encoding='utf-8', newline='') as f, \
+            open(moves_path, 'w', encoding='utf-8', newline='') as moves_file:
+        writer = csv.writer(f)
+        moves = csv.writer(moves_file)
+        writer.writerow(['change', 'brand', 'normalized_name', 'old_count', 'new_count',
+                         'old_ids', 'new_ids'])
+
+        for key, old_ids, new_ids in merge_join(old_sorted, new_sorted):
+            totals['old_spirits'] += len(old_ids)
+            totals['new_spirits'] += len(new_ids)
+            totals['old_groups'] += len(old_ids) > 1
+            totals['new_groups'] += len(new_ids) > 1
+
+            old_set = set(old_ids)
+            new_set = set(new_ids)
+            moves.writerows((row_id, 'old', key) for row_id in old_set - new_set)
+            moves.writerows((row_id, 'new', key) for row_id in new_set - old_set)
+
+            change = classify_group(len(old_ids), len(new_ids))
+            if change is None:
+                continue
+
+            brand, normalized_name = key.split('\x1f', 1)
+            group_counts[change] += 1
+            writer.writerow([change, brand, normalized_name, len(old_ids), len(new_ids),
+                             ' '.join(old_ids), ' '.join(new_ids)])
+            if len(group_examples[change]) < SUMMARY_EXAMPLES:
+                group_examples[change].append({
+                    'brand': brand,
+                    'normalized_name': normalized_name,
+                    'old_count': len(old_ids),
+                    'new_count': len(new_ids),
+                })
+
+    external_sort(map(tuple, _read_rows(moves_path)), sorted_moves_path)
+    os.remove(moves_path)
+
+    spirit_counts = {'added': 0, 'removed': 0, 'changed': 0}
+    spirit_examples = {kind: [] for kind in spirit_counts}
+    with open(f"{output_prefix}_spirits.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['change', 'id', 'old_key', 'new_key'])
+
+        # Records are (id, side, key, cluster id) sorted by id
+        for row_id, rows in itertools.groupby(_read_rows(sorted_moves_path), key=lambda r: r[0]):
+            sides = {side: key.replace('\x1f', ' | ') for _, side, key, _ in rows}
+            if 'old' in sides and 'new' in sides:
+                change = 'changed'
+            elif 'new' in sides:
+                change = 'added'
+            else:
+                change = 'removed'
+
+            spirit_counts[change] += 1
+            writer.writerow([change, row_id, sides.get('old', ''), sides.get('new', '')])
+            if len(spirit_examples[change]) < SUMMARY_EXAMPLES:
+                spirit_examples[change].append({
+                    'id': row_id,
+                    'old_key': sides.get('old'),
+                    'new_key': sides.get('new'),
+                })
+    os.remove(sorted_moves_path)
+
+    report = {
+        'old_snapshot': old_csv,
+        'new_snapshot': new_csv,
+        'totals': totals,
+        'spirits': {'counts': spirit_counts, 'examples': spirit_examples},
+        'duplicate_groups': {'counts': group_counts, 'examples': group_examples},
+    }
+    with open(f"{output_prefix}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    return report
+
+
+def print_snapshot_diff(old_csv: str, new_csv: str, cache_dir: str = '.snapshot_cache',
+                        output_prefix: str = 'duplicate_snapshot_diff'):
+    """Print a summary of duplicate changes between two exports."""
+    report = diff_snapshots(old_csv, new_csv, cache_dir, output_prefix)
+    totals = report['totals']
+
+    print(f"Old snapshot: {old_csv} ({totals['old_spirits']} spirits, {totals['old_groups']} duplicate groups)")
+    print(f"New snapshot: {new_csv} ({totals['new_spirits']} spirits, {totals['new_groups']} duplicate groups)")
+    print("=" * 80)
+
+    print("\n## SPIRITS ##\n")
+    for change, count in report['spirits']['counts'].items():
+        print(f"{change.title()}: {count}")
+
+    print("\n## DUPLICATE GROUPS ##\n")
+    for change, count in report['duplicate_groups']['counts'].items():
+        print(f"\n{change.title()} ({count} groups):")
+        for group in report['duplicate_groups']['examples'][change][:3]:
+            print(f"  {group['brand']}: '{group['normalized_name']}' "
+                  f"({group['old_count']} -> {group['new_count']})")
+
+    print(f"\n\nDiff report saved to: {output_prefix}.json")
+    print(f"Full details: {output_prefix}_groups.csv, {output_prefix}_spirits.csv")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Diff duplicate groups between two spirits exports.')
+    parser.add_argument('old_csv', help="Earlier export (e.g. yesterday's)")
+    parser.add_argument('new_csv', help="Later export (e.g. today's)")
+    parser.add_argument('--cache-dir', default='.snapshot_cache',
+                        help='Where sorted snapshots are cached and reused (default: .snapshot_cache)')
+    parser.add_argument('--output-prefix', default='duplicate_snapshot_diff',
+                        help='Prefix for the JSON summary and CSV detail files')
+    args = parser.parse_args()
+
+    print_snapshot_diff(args.old_csv, args.new_csv, args.cache_dir, args.output_prefix)
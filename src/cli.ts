@@ -1,6 +1,6 @@
 #!/usr/bin/env node
 
-import { Command } from 'commander';
+import { Command, Option } from 'commander';
 import { config } from 'dotenv';
 import { spiritExtractor } from './services/spirit-extractor.js';
 import { QueryGenerator } from './services/query-generator.js';
@@ -682,6 +682,10 @@ program
   .option('--show-details', 'Show detailed match analysis in console')
   .option('--show-clusters', 'Show similarity clusters in console')
   .option('--format <type>', 'Output format (summary|detailed|json)', 'summary')
+  .addOption(new Option('--engine <type>', 'Analysis engine; python offloads large runs to analyze_duplicates_dry_run.py')
+    .choices(['node', 'python'])
+    .default('node'))
+  .option('--source-url-prefilter', 'Collapse rows scraped from the same product page before blocking (python engine only)')
   .action(async (options) => {
     const spinner = ora('Initializing comprehensive dry-run analysis...').start();
     
@@ -700,7 +704,9 @@ program
           autoMergeThreshold: 1.0, // Never auto-merge in dry-run
         },
         exportDir: options.exportDir,
-        generateVisualizations: options.visualizations !== false
+        generateVisualizations: options.visualizations !== false,
+        engine: options.engine,
+        sourceUrlPrefilter: options.sourceUrlPrefilter === true
       });
       
       spinner.succeed('Dry-run analysis completed!');
@@ -728,6 +734,13 @@ program
       console.log(`🔍 Flag for review: ${report.summary.flaggedForReview}`);
       console.log(`❌ Ignore (low confidence): ${report.summary.ignoredDuplicates}`);
       
+      if (report.sourceUrlPrefilter) {
+        console.log('\n🔗 SOURCE URL PRE-FILTER');
+        console.log('─'.repeat(40));
+        console.log(`📄 Pages scraped more than once: ${report.sourceUrlPrefilter.duplicateGroups}`);
+        console.log(`🗑️  Rows removed before blocking: ${report.sourceUrlPrefilter.rowsRemoved}`);
+      }
+      
       if (report.blockingStats) {
         console.log('\n🚀 BLOCKING OPTIMIZATION');
         console.log('─'.repeat(40));
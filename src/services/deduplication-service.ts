@@ -698,6 +698,7 @@ export class DeduplicationService {
     let brandScore = 0;
     let brandWeight = config.differentBrandWeight || 0.4;
     let brandMatch: BrandNormalizationResult | undefined;
+    let isSameBrand = false;
     
     if (spirit1.brand && spirit2.brand) {
       const brand1Norm = normalizeBrandName(spirit1.brand, config.brandConfig);
@@ -709,6 +710,7 @@ export class DeduplicationService {
         brandScore = 1.0;
         // Use lower weight for same brand comparisons
         brandWeight = config.sameBrandWeight || 0.15;
+        isSameBrand = true;
       } else {
         const brandFuzzy = fuzzyMatch(brand1Norm.canonical, brand2Norm.canonical, config.fuzzyConfig);
         brandScore = brandFuzzy.similarity;
@@ -735,7 +737,6 @@ export class DeduplicationService {
 
     // Determine if this is a match
     // Use lower threshold for same-brand products
-    const isSameBrand = brand1 && brand2 && brand1Norm?.canonical === brand2Norm?.canonical;
     const effectiveThreshold = isSameBrand ? 0.5 : config.combinedThreshold;  // Lowered from 0.65 to 0.5 for aggressive duplicate detection
     
     if (finalScore < effectiveThreshold) {
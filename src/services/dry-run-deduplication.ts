@@ -20,8 +20,24 @@ import { ExactMatchDeduplicationService } from './exact-match-deduplication.js';
 import { FuzzyMatchDeduplicationService } from './fuzzy-match-deduplication.js';
 import { PriceVariationHandler, PriceVariationGroup } from './price-variation-handler.js';
 import { BlockingDeduplicationService } from './blocking-deduplication.js';
-import { writeFileSync } from 'fs';
-import { join } from 'path';
+import { closeSync, mkdtempSync, openSync, readFileSync, rmSync, writeFileSync, writeSync } from 'fs';
+import { tmpdir } from 'os';
+import { dirname, join, resolve } from 'path';
+import { spawn } from 'child_process';
+import { fileURLToPath } from 'url';
+
+/**
+ * Batch engine (repo root) that runs the same analysis outside the Node heap
+ */
+const PYTHON_ENGINE_SCRIPT = resolve(
+  dirname(fileURLToPath(import.meta.url)),
+  '../../analyze_duplicates_dry_run.py'
+);
+
+/**
+ * Matches returned to the CLI by the Python engine; exported files hold all of them
+ */
+const PYTHON_ENGINE_MAX_RESPONSE_MATCHES = 1000;
 
 /**
  * Detailed duplicate match with extended analysis
@@ -113,6 +129,12 @@ export interface DryRunReport {
     groups: PriceVariationGroup[];
     summary: any;
   };
+  // Python engine with sourceUrlPrefilter: rows sharing a product page URL, collapsed before blocking
+  sourceUrlPrefilter?: {
+    rowsIn: number;
+    rowsRemoved: number;
+    duplicateGroups: number;
+  };
   impactAssessment: {
     spiritsToBeRemoved: number;
     dataFieldsToBeEnhanced: number;
@@ -155,23 +177,44 @@ export class DryRunDeduplicationService {
     customConfig?: Partial<DeduplicationConfig>;
     exportDir?: string;
     generateVisualizations?: boolean;
+    engine?: 'node' | 'python';
+    // Python engine only: collapse rows scraped from the same product page before blocking
+    sourceUrlPrefilter?: boolean;
+    // Analyze these spirits instead of fetching them from the database
+    spirits?: DatabaseSpirit[];
   } = {}): Promise<DryRunReport> {
     const {
       incrementalOnly = false,
       useBlocking = true,
       customConfig,
       exportDir = './dry-run-reports',
-      generateVisualizations = true
+      generateVisualizations = true,
+      engine = 'node',
+      sourceUrlPrefilter = false
     } = options;
 
+    if (sourceUrlPrefilter && engine !== 'python') {
+      throw new Error('The source URL pre-filter is only available with the python engine');
+    }
+
     const startTime = Date.now();
     logger.info('Starting comprehensive dry-run deduplication analysis');
 
     try {
       // Get spirits for analysis
-      const spirits = await this.fetchSpiritsForAnalysis(incrementalOnly);
+      const spirits = options.spirits ?? await this.fetchSpiritsForAnalysis(incrementalOnly);
       logger.info(`Analyzing ${spirits.length} spirits in dry-run mode`);
 
+      if (engine === 'python') {
+        return await this.runPythonEngine(spirits, {
+          useBlocking,
+          customConfig: { ...this.deduplicationService['config'], ...customConfig },
+          exportDir,
+          generateVisualizations,
+          sourceUrlPrefilter
+        });
+      }
+
       const report: DryRunReport = {
         summary: {
           totalSpiritsAnalyzed: spirits.length,
@@ -285,6 +328,85 @@ export class DryRunDeduplicationService {
     }
   }
 
+  /**
+   * Offload the analysis to the Python batch engine.
+   *
+   * Spirits are streamed to a JSONL file and the engine is driven through a
+   * request/response file pair, so neither side holds the dataset twice in
+   * memory or pipes it over stdout. The engine writes the same export files.
+   */
+  private async runPythonEngine(
+    spirits: DatabaseSpirit[],
+    options: {
+      useBlocking: boolean;
+      customConfig: Partial<DeduplicationConfig>;
+      exportDir: string;
+      generateVisualizations: boolean;
+      sourceUrlPrefilter: boolean;
+    }
+  ): Promise<DryRunReport> {
+    const workDir = mkdtempSync(join(tmpdir(), 'dry-run-'));
+    const inputPath = join(workDir, 'spirits.jsonl');
+    const requestPath = join(workDir, 'request.json');
+    const responsePath = join(workDir, 'response.json');
+
+    try {
+      const fd = openSync(inputPath, 'w');
+      try {
+        for (const spirit of spirits) {
+          writeSync(fd, JSON.stringify(spirit) + '\n');
+        }
+      } finally {
+        closeSync(fd);
+      }
+
+      writeFileSync(requestPath, JSON.stringify({
+        input: inputPath,
+        exportDir: resolve(options.exportDir),
+        useBlocking: options.useBlocking,
+        generateVisualizations: options.generateVisualizations,
+        sourceUrlPrefilter: options.sourceUrlPrefilter,
+        customConfig: options.customConfig,
+        maxResponseMatches: PYTHON_ENGINE_MAX_RESPONSE_MATCHES,
+        responsePath
+      }));
+
+      const python = process.env.PYTHON || 'python3';
+      logger.info(`Running Python dry-run engine: ${python} ${PYTHON_ENGINE_SCRIPT}`);
+
+      await new Promise<void>((resolvePromise, reject) => {
+        const child = spawn(python, [PYTHON_ENGINE_SCRIPT, '--request', requestPath], {
+          stdio: ['ignore', 'inherit', 'inherit']
+        });
+        child.on('error', reject);
+        // A non-zero exit still writes an error response, which is surfaced below
+        child.on('close', () => resolvePromise());
+      });
+
+      let response: { status: 'ok'; report: DryRunReport } | { status: 'error'; error: string };
+      try {
+        response = JSON.parse(readFileSync(responsePath, 'utf-8'));
+      } catch {
+        throw new Error('Python dry-run engine exited without writing a response');
+      }
+
+      if (response.status !== 'ok') {
+        throw new Error(`Python dry-run engine failed: ${response.error}`);
+      }
+
+      logger.info('Dry-run analysis completed (python engine)', {
+        totalAnalyzed: response.report.summary.totalSpiritsAnalyzed,
+        duplicatesFound: response.report.summary.totalDuplicatesFound,
+        potentialMerges: response.report.summary.potentialMerges,
+        processingTimeMs: response.report.summary.processingTime
+      });
+
+      return response.report;
+    } finally {
+      rmSync(workDir, { recursive: true, force: true });
+    }
+  }
+
   /**
    * Find all duplicate matches with detailed analysis
    */
@@ -1025,6 +1147,13 @@ export class DryRunDeduplicationService {
     lines.push(`  Ignore (low confidence): ${report.summary.ignoredDuplicates}`);
     lines.push('');
     
+    if (report.sourceUrlPrefilter) {
+      lines.push('SOURCE URL PRE-FILTER:');
+      lines.push(`  Product pages scraped more than once: ${report.sourceUrlPrefilter.duplicateGroups}`);
+      lines.push(`  Rows removed before blocking: ${report.sourceUrlPrefilter.rowsRemoved} of ${report.sourceUrlPrefilter.rowsIn.toLocaleString()}`);
+      lines.push('');
+    }
+    
     if (report.blockingStats) {
       lines.push('BLOCKING OPTIMIZATION:');
       lines.push(`  Total blocks created: ${report.blockingStats.totalBlocks}`);
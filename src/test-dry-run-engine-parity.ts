@@ -0,0 +1,193 @@
+#!/usr/bin/env tsx
+
+/**
+ * Parity check between the Node and Python dry-run engines.
+ *
+ * Runs both engines on the same fixture, once with blocking (more than 100
+ * spirits), once on a subset without it and once with listings of a product
+ * sharing its page URL, and fails on any difference in matches, summary
+ * counts, blocking stats, clusters, impact assessment or price variation
+ * summary. The shared-URL case runs with default options: the Python
+ * engine's source URL pre-filter is off unless requested.
+ */
+
+// Set environment variables for testing
+process.env.SUPABASE_URL = 'https://test.supabase.co';
+process.env.SUPABASE_SERVICE_KEY = 'test-key';
+
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { DryRunDeduplicationService, DryRunReport } from './services/dry-run-deduplication.js';
+import { DatabaseSpirit } from './types/index.js';
+
+const SIMILARITY_TOLERANCE = 1e-9;
+
+const BRANDS = ['Buffalo Trace', 'Eagle Rare', "Maker's Mark", 'Makers Mark', 'Wild Turkey', 'The Macallan',
+  'Macallan', 'Glenfiddich', 'Ardbeg', 'Jameson', 'Redbreast', 'Hennessy', 'Copper Fox Distillery',
+  'Stone Ridge Spirits', 'Old Mill Co'];
+const TYPES = ['Bourbon', 'Scotch', 'Irish Whiskey', 'Rye Whiskey', 'Cognac', 'Single Malt', undefined];
+const LINES = ['Small Batch', 'Single Barrel', 'Cask Strength', 'Bottled in Bond', 'Private Selection',
+  'Straight Bourbon Whiskey', 'Double Oak', 'Sherry Oak', 'Port Cask', 'Rye', 'Original', 'Barrel Proof'];
+const AGES = ['', '', '10 Year', '12 Year Old', '18 Year', '8 Yr'];
+const SIZES = ['', '750ml', '1L', '1.75L', '375ml', '700 ml'];
+const EXTRAS = ['', '', 'Gift Box', '(2019)', '2021 Release', '90 Proof', '101 proof', '46% ABV'];
+
+// Deterministic fixture: near-duplicate listings of a smaller set of products
+function buildFixture(count: number, sharedUrls = false): DatabaseSpirit[] {
+  let seed = 42;
+  const next = () => {
+    seed = (seed * 16807) % 2147483647;
+    return seed / 2147483647;
+  };
+  const pick = <T>(items: T[]): T => items[Math.floor(next() * items.length)];
+
+  const products = Array.from({ length: Math.ceil(count / 3) }, () => ({
+    brand: pick(BRANDS),
+    name: [pick(LINES), pick(AGES)].filter(Boolean).join(' '),
+    type: pick(TYPES),
+    price: Math.round((20 + next() * 200) * 100) / 100
+  }));
+
+  return Array.from({ length: count }, (_, i) => {
+    const productIndex = Math.floor(next() * products.length);
+    const product = products[productIndex];
+    const name = [next() < 0.7 ? product.brand : '', product.name, pick(SIZES), pick(EXTRAS)]
+      .filter(Boolean)
+      .join(' ');
+    return {
+      id: `parity-${String(i).padStart(4, '0')}`,
+      name,
+      brand: next() < 0.9 ? product.brand : undefined,
+      type: product.type,
+      price: next() < 0.8 ? Math.round(product.price * (0.8 + next() * 0.45) * 100) / 100 : undefined,
+      abv: pick([undefined, 40, 43, 45, 50.5]),
+      description: next() < 0.5
+        ? `${product.brand} ${product.name} aged in charred oak barrels with notes of vanilla and spice`
+        : undefined,
+      source_url: `https://shop.example.com/p/${sharedUrls ? productIndex : i}`,
+      created_at: `2024-0${1 + (i % 9)}-15T10:00:00Z`
+    } as DatabaseSpirit;
+  });
+}
+
+function compareReports(label: string, node: DryRunReport, python: DryRunReport): string[] {
+  const errors: string[] = [];
+  const close = (a: number | null | undefined, b: number | null | undefined) =>
+    (a == null && b == null) || (a != null && b != null && Math.abs(a - b) <= SIMILARITY_TOLERANCE);
+
+  if (python.matches.length !== python.summary.totalDuplicatesFound) {
+    errors.push(`${label}: python response was truncated; shrink the fixture`);
+  }
+
+  for (const key of ['totalSpiritsAnalyzed', 'totalDuplicatesFound', 'potentialMerges',
+    'flaggedForReview', 'ignoredDuplicates', 'estimatedDataQualityImprovement'] as const) {
+    if (node.summary[key] !== python.summary[key]) {
+      errors.push(`${label}: summary.${key} node=${node.summary[key]} python=${python.summary[key]}`);
+    }
+  }
+
+  const count = Math.max(node.matches.length, python.matches.length);
+  for (let i = 0; i < count; i++) {
+    const a = node.matches[i];
+    const b = python.matches[i];
+    const describe = (m: typeof a) => m
+      ? `${m.spirit1.id}/${m.spirit2.id} ${m.matchType} ${m.confidence} ${m.recommendedAction} ${m.similarity}`
+      : 'missing';
+    if (!a || !b || a.spirit1.id !== b.spirit1.id || a.spirit2.id !== b.spirit2.id ||
+        a.matchType !== b.matchType || a.confidence !== b.confidence ||
+        a.recommendedAction !== b.recommendedAction || !close(a.similarity, b.similarity)) {
+      errors.push(`${label}: match ${i + 1} node=${describe(a)} python=${describe(b)}`);
+      break;
+    }
+  }
+
+  if (!!node.blockingStats !== !!python.blockingStats) {
+    errors.push(`${label}: blockingStats present in only one engine`);
+  } else if (node.blockingStats && python.blockingStats) {
+    for (const [key, value] of Object.entries(node.blockingStats)) {
+      const other = (python.blockingStats as Record<string, number>)[key];
+      if (!close(value as number, other)) {
+        errors.push(`${label}: blockingStats.${key} node=${value} python=${other}`);
+      }
+    }
+  }
+
+  const clusterShape = (report: DryRunReport) => report.clusters.map(cluster => ({
+    clusterId: cluster.clusterId,
+    center: cluster.centerSpirit.id,
+    members: cluster.members.map(member => `${member.spirit.id}:${member.relationship}`),
+    recommendedAction: cluster.recommendedAction
+  }));
+  if (JSON.stringify(clusterShape(node)) !== JSON.stringify(clusterShape(python))) {
+    errors.push(`${label}: clusters differ`);
+  } else if (node.clusters.some((cluster, i) =>
+    !close(cluster.clusterSimilarity, python.clusters[i].clusterSimilarity))) {
+    errors.push(`${label}: cluster similarities differ`);
+  }
+
+  const impact = (report: DryRunReport) => JSON.stringify({
+    ...report.impactAssessment,
+    estimatedDuplicationReduction: report.impactAssessment.estimatedDuplicationReduction.toFixed(9)
+  });
+  if (impact(node) !== impact(python)) {
+    errors.push(`${label}: impactAssessment differs`);
+  }
+
+  const priceShape = (report: DryRunReport) => JSON.stringify({
+    keys: report.priceVariationAnalysis?.groups.map(group =>
+      `${group.normalizedKey}:${group.primarySpirit.id}:${group.suggestedAction}`),
+    summary: {
+      ...report.priceVariationAnalysis?.summary,
+      averageCoefficientOfVariation: report.priceVariationAnalysis?.summary.averageCoefficientOfVariation.toFixed(9)
+    }
+  });
+  if (priceShape(node) !== priceShape(python)) {
+    errors.push(`${label}: priceVariationAnalysis differs`);
+  }
+
+  return errors;
+}
+
+async function testEngineParity() {
+  const exportDir = mkdtempSync(join(tmpdir(), 'dry-run-parity-'));
+  const fixture = buildFixture(160);
+  const service = new DryRunDeduplicationService();
+  const errors: string[] = [];
+
+  try {
+    for (const [label, spirits, useBlocking] of [
+      ['blocked', fixture, true],
+      ['unblocked', fixture.slice(0, 60), false],
+      ['shared URLs', buildFixture(160, true), true]
+    ] as const) {
+      const options = {
+        spirits: [...spirits],
+        useBlocking,
+        exportDir,
+        generateVisualizations: true,
+        customConfig: { combinedThreshold: 0.75, autoMergeThreshold: 1.0 }
+      };
+      const node = await service.runDryRunAnalysis({ ...options, engine: 'node' });
+      const python = await service.runDryRunAnalysis({ ...options, engine: 'python' });
+
+      const reportErrors = compareReports(label, node, python);
+      console.log(`${reportErrors.length ? '❌' : '✅'} ${label}: ${node.matches.length} node matches, ` +
+        `${python.matches.length} python matches`);
+      errors.push(...reportErrors);
+    }
+  } finally {
+    rmSync(exportDir, { recursive: true, force: true });
+  }
+
+  if (errors.length > 0) {
+    errors.forEach(error => console.error(`   ${error}`));
+    process.exit(1);
+  }
+  console.log('\n✅ Node and Python dry-run engines agree');
+}
+
+testEngineParity().catch(error => {
+  console.error('❌ Parity check failed:', error);
+  process.exit(1);
+});